@@ -1,4 +1,7 @@
-from app import app, db, Course
+from app import create_app
+from services.bootstrap import seed_courses
+
+app = create_app()
 with app.app_context():
     # Add courses for each category
     new_courses = [
@@ -36,8 +39,5 @@ with app.app_context():
         {"title": "QuickBooks Basics", "description": "Introduction to QuickBooks for accounting.", "fee": 2500, "category": "accounting", "type": "beginner"},
     ]
 
-    for c in new_courses:
-        if not Course.query.filter_by(title=c["title"]).first():
-            db.session.add(Course(title=c["title"], description=c["description"], fee=c["fee"], category=c.get("category"), type=c.get("type")))
-    db.session.commit()
-    print('Added new courses for computer coaching categories')
+    added = seed_courses(new_courses)
+    print(f'Added {added} new courses for computer coaching categories')
@@ -7,6 +7,7 @@ from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from dotenv import load_dotenv
+from werkzeug.middleware.proxy_fix import ProxyFix
 import click
 
 # Import blueprints
@@ -19,6 +20,22 @@ from blueprints.game import game_bp
 
 # Import models and utils
 from models import db, User, Course
+from services.stats import rebuild_stats_command
+from services.bootstrap import bootstrap_courses
+from services.catalog import course_catalog
+from services.index_audit import check_indexes_command
+from services.mail_queue import mail_worker_command
+from services.notification_stream import notification_stream
+from services.notification_retention import archive_notifications_command
+from services.leaderboards import bootstrap_leaderboards, leaderboard_engine, rebuild_leaderboards_command
+from services.score_ranks import bootstrap_score_buckets, rebuild_score_buckets_command
+from services.question_bank import question_bank
+from services.question_import import import_questions_command
+from services.question_generation import question_generator
+from services.identity import identity_cache
+from services.chat_intents import intent_engine
+from services.rate_limit import rate_limiter
+from services.search import rebuild_search_index_command
 
 def create_app():
     load_dotenv()
@@ -33,12 +50,76 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URI", "sqlite:///vidyasetu.db")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-    # Mail config
-    app.config['MAIL_SERVER'] = "smtp.gmail.com"
-    app.config['MAIL_PORT'] = 587
-    app.config['MAIL_USE_TLS'] = True
+    # Read dashboard stats from the stat_counter table instead of aggregates
+    app.config['STATS_COUNTERS'] = os.getenv("STATS_COUNTERS", "false").lower() == "true"
+
+    # Course catalog cache: optional Redis URL shares the version across workers
+    app.config['CATALOG_REDIS_URL'] = os.getenv("CATALOG_REDIS_URL")
+    app.config['CATALOG_CACHE_TTL'] = int(os.getenv("CATALOG_CACHE_TTL", "60"))
+
+    # Rendered certificate PDFs (defaults to <instance>/certificates)
+    app.config['CERTIFICATE_STORAGE_DIR'] = os.getenv("CERTIFICATE_STORAGE_DIR")
+
+    # Store admin-wide notifications once instead of one row per admin
+    app.config['NOTIFICATION_BROADCASTS'] = os.getenv("NOTIFICATION_BROADCASTS", "false").lower() == "true"
+    # Notification push stream: Redis URL needed to reach clients on other workers
+    app.config['NOTIFICATION_BROKER_URL'] = os.getenv("NOTIFICATION_BROKER_URL")
+    app.config['NOTIFICATION_STREAM_KEEPALIVE'] = int(os.getenv("NOTIFICATION_STREAM_KEEPALIVE", "15"))
+    app.config['NOTIFICATION_STREAM_MAX_AGE'] = int(os.getenv("NOTIFICATION_STREAM_MAX_AGE", "300"))
+    # Each open stream holds a worker thread: off by default (dashboards poll), and
+    # when on keep the per-process cap well below WEB_THREADS
+    app.config['NOTIFICATION_STREAMS'] = os.getenv("NOTIFICATION_STREAMS", "false").lower() == "true"
+    app.config['NOTIFICATION_STREAM_MAX_OPEN'] = int(os.getenv("NOTIFICATION_STREAM_MAX_OPEN", "4"))
+    # Read notifications older than this are moved out by `flask archive-notifications`
+    app.config['NOTIFICATION_RETENTION_DAYS'] = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+
+    # Seconds before a worker reloads leaderboards to pick up other workers' scores
+    app.config['LEADERBOARD_CACHE_TTL'] = int(os.getenv("LEADERBOARD_CACHE_TTL", "10"))
+    # Score histogram bucket size for rank lookups; seed-data rebuilds the histograms when it changes
+    app.config['SCORE_BUCKET_WIDTH'] = int(os.getenv("SCORE_BUCKET_WIDTH", "10"))
+
+    # Quiz question pools: optional Redis URL shares the bank version and seen marks across workers
+    app.config['QUESTION_BANK_REDIS_URL'] = os.getenv("QUESTION_BANK_REDIS_URL")
+    app.config['QUESTION_BANK_CACHE_TTL'] = int(os.getenv("QUESTION_BANK_CACHE_TTL", "300"))
+
+    # Logged-in user snapshots: optional Redis URL shares the per-user versions across workers
+    app.config['IDENTITY_REDIS_URL'] = os.getenv("IDENTITY_REDIS_URL")
+    app.config['IDENTITY_CACHE_TTL'] = int(os.getenv("IDENTITY_CACHE_TTL", "60"))
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+
+    # Chat bot intents (defaults to services/chat_intents.json)
+    app.config['CHAT_INTENTS_FILE'] = os.getenv("CHAT_INTENTS_FILE")
+
+    # Token-bucket limits on chat, OTP, signup and enquiry; Redis URL shares the buckets across workers
+    app.config['RATE_LIMIT_ENABLED'] = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    app.config['RATE_LIMIT_REDIS_URL'] = os.getenv("RATE_LIMIT_REDIS_URL")
+    app.config['RATE_LIMIT_MAX_INFLIGHT'] = int(os.getenv("RATE_LIMIT_MAX_INFLIGHT", "8"))
+    # Proxies in front of the app whose X-Forwarded-For is trusted for client IPs
+    trusted_proxies = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies)
+
+    # Question generation API (point SABANOVA_API_URL at a local stub server to test)
+    app.config['SABANOVA_API_URL'] = os.getenv("SABANOVA_API_URL", "")
+    app.config['SABANOVA_API_KEY'] = os.getenv("SABANOVA_API_KEY", "")
+    app.config['SABANOVA_API_TIMEOUT'] = int(os.getenv("SABANOVA_API_TIMEOUT", "30"))
+    # Reuse identical generation results and keep a per-category buffer filled in the background
+    app.config['QUESTION_GENERATION_CACHE_TTL'] = int(os.getenv("QUESTION_GENERATION_CACHE_TTL", "600"))
+    app.config['QUESTION_PREFETCH'] = os.getenv("QUESTION_PREFETCH", "false").lower() == "true"
+    app.config['QUESTION_PREFETCH_BUFFER'] = int(os.getenv("QUESTION_PREFETCH_BUFFER", "30"))
+
+    # Mail config (override server/port/TLS to test against a local debugging SMTP server)
+    app.config['MAIL_SERVER'] = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+    app.config['MAIL_PORT'] = int(os.getenv("MAIL_PORT", "587"))
+    app.config['MAIL_USE_TLS'] = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
     app.config['MAIL_USERNAME'] = os.getenv("MAIL_USERNAME")
     app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
+    # Enqueue mail to the outbox for `flask mail-worker` instead of sending inline
+    app.config['MAIL_QUEUE'] = os.getenv("MAIL_QUEUE", "false").lower() == "true"
+    # Pooled SMTP connections kept open between sends
+    app.config['MAIL_POOL_SIZE'] = int(os.getenv("MAIL_POOL_SIZE", "2"))
+    app.config['MAIL_POOL_IDLE_TIMEOUT'] = int(os.getenv("MAIL_POOL_IDLE_TIMEOUT", "60"))
+    app.config['MAIL_POOL_KEEPALIVE'] = int(os.getenv("MAIL_POOL_KEEPALIVE", "15"))
 
     # Initialize extensions
     db.init_app(app)
@@ -46,6 +127,14 @@ def create_app():
     bcrypt = Bcrypt(app)
     csrf = CSRFProtect(app)
     mail = Mail(app)
+    course_catalog.init_app(app)
+    notification_stream.init_app(app)
+    leaderboard_engine.init_app(app)
+    question_bank.init_app(app)
+    question_generator.init_app(app)
+    identity_cache.init_app(app)
+    intent_engine.init_app(app)
+    rate_limiter.init_app(app)
 
     # Login Manager
     login_manager = LoginManager(app)
@@ -53,7 +142,8 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Served from the identity cache; ids are UUID strings
+        return identity_cache.load(user_id)
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -65,6 +155,14 @@ def create_app():
 
     # Register CLI commands
     app.cli.add_command(seed_data_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(check_indexes_command)
+    app.cli.add_command(mail_worker_command)
+    app.cli.add_command(archive_notifications_command)
+    app.cli.add_command(rebuild_leaderboards_command)
+    app.cli.add_command(rebuild_score_buckets_command)
+    app.cli.add_command(import_questions_command)
+    app.cli.add_command(rebuild_search_index_command)
 
     # Register error handlers
     register_error_handlers(app)
@@ -106,15 +204,12 @@ def seed_initial_data(bcrypt):
         draw.polygon([(20, 200), (180, 200), (150, 100), (50, 100)], fill='#cccccc')  # Body
         user_img.save(default_user_pic_file)
 
-    # Seed courses
-    courses = [
-        {"title": "Python Programming", "description": "Learn Python basics to advanced.", "fee": 3000, "category": "programming", "type": "beginner"},
-        {"title": "Web Development", "description": "Build websites with HTML, CSS, JS.", "fee": 3500, "category": "development", "type": "intermediate"},
-        {"title": "Data Science", "description": "Data analysis & ML basics.", "fee": 4000, "category": "business", "type": "advanced"},
-    ]
-    for c in courses:
-        if not Course.query.filter_by(title=c["title"]).first():
-            db.session.add(Course(title=c["title"], description=c["description"], fee=c["fee"], category=c.get("category"), type=c.get("type")))
+    # Seed courses (skipped once the bootstrap marker is current)
+    bootstrap_courses()
+
+    # Seed leaderboards and rank histograms from existing scores
+    bootstrap_leaderboards()
+    bootstrap_score_buckets()
 
     # Create main admin
     if not User.query.filter_by(role='main_admin').first():
@@ -4,8 +4,17 @@ from datetime import datetime
 from flask import Blueprint, render_template, request, redirect, url_for, jsonify, flash, current_app, session
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from models import db, User, AdminCourseAccess, Course, Enrollment, Payment, Certificate, Referral, Enquiry, Notification
+from models import db, User, AdminCourseAccess, Course, Enrollment, Payment, Certificate, Referral, Enquiry, Notification, NotificationReceipt
 from utils import send_otp_email, send_admin_added_user_email
+from services.ledger import calculate_enrollment_dues
+from services.bootstrap import ensure_bootstrapped
+from services.catalog import course_catalog, get_courses
+from services.chat_intents import intent_engine
+from services.search import course_search_filter, substring_filter
+from services.certificates import send_certificate
+from services.notifications import dismiss_all, mark_read, notify_course_students, poll_notifications_response, stream_notifications_response, user_notifications
+from services.stats import counters_enabled, get_dashboard_stats, rebuild_counters
+from services.pagination import InvalidPageRequest, keyset_page, parse_limit
 from blueprints.main import allowed_file
 
 admin_bp = Blueprint('admin', __name__)
@@ -18,272 +27,297 @@ def admin_panel():
     if current_user.role not in ['admin', 'main_admin']:
         return redirect(url_for("main.home"))
 
-    # Seed courses if not exist
-    courses_list = [
-        {"title": "Python Programming", "description": "Learn Python basics to advanced.", "fee": 3000, "category": "programming", "type": "beginner"},
-        {"title": "Web Development", "description": "Build websites with HTML, CSS, JS.", "fee": 3500, "category": "development", "type": "intermediate"},
-        {"title": "Data Science", "description": "Data analysis & ML basics.", "fee": 4000, "category": "business", "type": "advanced"},
-    ]
-    for c in courses_list:
-        if not Course.query.filter_by(title=c["title"]).first():
-            db.session.add(Course(title=c["title"], description=c["description"], fee=c["fee"], category=c.get("category"), type=c.get("type")))
-    db.session.commit()
+    # Seed default courses once per process (no-op once the marker is current)
+    ensure_bootstrapped()
 
-    # Query all necessary data
-    users = User.query.all()
-    courses = Course.query.all()
-    enrollments = Enrollment.query.filter(Enrollment.status != 'cancelled').all()
-    payments = Payment.query.all()
-    certificates = Certificate.query.all()
-    enquiries = Enquiry.query.all()
-    notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).order_by(Notification.timestamp.desc()).all()
+    # The tables load page by page from /admin/api/panel; courses come from the catalog cache
+    courses = get_courses()
+    notifications = user_notifications(current_user, unread_only=True)
 
     # Calculate statistics (exclude cancelled enrollments)
-    stats = {
-        "total_users": len(users),
-        "total_courses": len(courses),
-        "total_enrollments": Enrollment.query.filter(Enrollment.status != 'cancelled').count(),
-        "total_revenue": sum(p.amount for p in payments if p.status == 'completed')
-    }
-
-    # Calculate dues for each active enrollment
-    enrollment_dues = {}
-    for enrollment in enrollments:
-        if enrollment.status == 'active':
-            # Calculate total paid for this enrollment
-            total_paid = db.session.query(db.func.sum(Payment.amount)).filter(
-                Payment.enrollment_id == enrollment.id,
-                Payment.status == 'completed'
-            ).scalar() or 0
-            due = enrollment.course.fee - total_paid
-            if due > 0:
-                enrollment_dues[enrollment.id] = due
+    stats = get_dashboard_stats()
 
     return render_template(
         "admin_panel.html",
         stats=stats,
-        users=users,
         courses=courses,
-        enrollments=enrollments,
-        payments=payments,
-        certificates=certificates,
-        enquiries=enquiries,
-        enrollment_dues=enrollment_dues,
         notifications=notifications
     )
 
-@admin_bp.route("/api/panel")
-@login_required
-def admin_api_panel():
-    print("admin_api_panel function hit!") # Added logging
-    if current_user.role not in ['admin', 'main_admin']:
-        return jsonify({"success": False, "message": "Unauthorized access"}), 403
+# ---------- ADMIN PANEL API ----------
+def _format_datetime(value, fmt='%Y-%m-%d %H:%M:%S'):
+    return value.strftime(fmt) if value else None
+
+def _serialize_user(u):
+    return {
+        "id": u.id,
+        "username": u.username,
+        "email": u.email,
+        "full_name": u.full_name,
+        "mobile_number": u.mobile_number,
+        "discount": u.discount,
+        "referred_by": u.referred_by,
+        "role": u.role,
+        "status": u.status,
+        "created_on": _format_datetime(u.created_on)
+    }
 
-    # Get search parameters
-    search_user = request.args.get('search_user', '').strip()
-    search_course = request.args.get('search_course', '').strip()
-    search_enrollment = request.args.get('search_enrollment', '').strip()
-    search_payment = request.args.get('search_payment', '').strip()
-    search_certificate = request.args.get('search_certificate', '').strip()
-    search_enquiry = request.args.get('search_enquiry', '').strip()
-
-    # Query all necessary data with filters
-    users_query = User.query
-    if search_user:
-        users_query = users_query.filter(
-            db.or_(
-                User.username.ilike(f'%{search_user}%'),
-                User.email.ilike(f'%{search_user}%'),
-                User.full_name.ilike(f'%{search_user}%')
-            )
-        )
-    users = users_query.all()
+def _serialize_course(c):
+    return {
+        "id": c.id,
+        "title": c.title,
+        "description": c.description,
+        "fee": c.fee,
+        "category": c.category,
+        "type": c.type,
+        "image_file": c.image_file
+    }
 
-    courses_query = Course.query
-    if search_course:
-        courses_query = courses_query.filter(
-            db.or_(
-                Course.title.ilike(f'%{search_course}%'),
-                Course.category.ilike(f'%{search_course}%'),
-                Course.description.ilike(f'%{search_course}%')
-            )
-        )
-    courses = courses_query.all()
+def _serialize_enrollment(e):
+    return {
+        "id": e.id,
+        "user_id": e.user_id,
+        "course_id": e.course_id,
+        "status": e.status,
+        "enrolled_on": _format_datetime(e.enrolled_on),
+        "course": {
+            "title": e.course.title if e.course else None
+        },
+        "user": {
+            "username": e.user.username if e.user else None,
+            "full_name": e.user.full_name if e.user else None
+        }
+    }
 
-    enrollments_query = Enrollment.query.filter(Enrollment.status != 'cancelled')
-    if search_enrollment:
-        enrollments_query = enrollments_query.join(User).join(Course).filter(
-            db.or_(
-                User.username.ilike(f'%{search_enrollment}%'),
-                User.full_name.ilike(f'%{search_enrollment}%'),
-                Course.title.ilike(f'%{search_enrollment}%')
-            )
-        )
-    enrollments = enrollments_query.all()
+def _serialize_payment(p):
+    return {
+        "id": p.id,
+        "user_id": p.user_id,
+        "enrollment_id": p.enrollment_id,
+        "amount": p.amount,
+        "status": p.status,
+        "created_on": _format_datetime(p.created_on),
+        "user": {
+            "username": p.user.username if p.user else None,
+            "full_name": p.user.full_name if p.user else None
+        },
+        "enrollment": {
+            "course": {
+                "title": p.enrollment.course.title if p.enrollment and p.enrollment.course else None
+            }
+        }
+    }
 
-    payments_query = Payment.query
-    if search_payment:
-        payments_query = payments_query.join(User).outerjoin(Enrollment).outerjoin(Course).filter(
-            db.or_(
-                User.username.ilike(f'%{search_payment}%'),
-                User.full_name.ilike(f'%{search_payment}%'),
-                Course.title.ilike(f'%{search_payment}%') if Course else db.literal(False)
-            )
-        )
-    payments = payments_query.all()
+def _serialize_certificate(cert):
+    return {
+        "id": cert.id,
+        "username": cert.username,
+        "course_title": cert.course_title,
+        "date": _format_datetime(cert.date, '%Y-%m-%d')
+    }
 
-    certificates_query = Certificate.query
-    if search_certificate:
-        certificates_query = certificates_query.filter(
+def _serialize_enquiry(eq):
+    return {
+        "id": eq.id,
+        "name": eq.name,
+        "email": eq.email,
+        "phone": eq.phone,
+        "course": eq.course,
+        "message": eq.message,
+        "created_on": _format_datetime(eq.created_on)
+    }
+
+def _matching_users(search):
+    return db.select(User.id).where(substring_filter(User, ('username', 'full_name'), search))
+
+def _matching_courses(search):
+    return db.select(Course.id).where(course_search_filter(search))
+
+def _users_query(search):
+    query = User.query
+    if search:
+        query = query.filter(substring_filter(User, ('username', 'email', 'full_name'), search))
+    return query
+
+def _courses_query(search):
+    query = Course.query
+    if search:
+        query = query.filter(course_search_filter(search))
+    return query
+
+def _enrollments_query(search):
+    query = Enrollment.query.filter(Enrollment.status != 'cancelled')
+    if search:
+        query = query.filter(
             db.or_(
-                Certificate.username.ilike(f'%{search_certificate}%'),
-                Certificate.course_title.ilike(f'%{search_certificate}%')
+                Enrollment.user_id.in_(_matching_users(search)),
+                Enrollment.course_id.in_(_matching_courses(search))
             )
         )
-    certificates = certificates_query.all()
+    return query
 
-    enquiries_query = Enquiry.query
-    if search_enquiry:
-        enquiries_query = enquiries_query.filter(
+def _payments_query(search):
+    query = Payment.query
+    if search:
+        query = query.filter(
             db.or_(
-                Enquiry.name.ilike(f'%{search_enquiry}%'),
-                Enquiry.email.ilike(f'%{search_enquiry}%'),
-                Enquiry.course.ilike(f'%{search_enquiry}%'),
-                Enquiry.message.ilike(f'%{search_enquiry}%')
+                Payment.user_id.in_(_matching_users(search)),
+                Payment.enrollment_id.in_(db.select(Enrollment.id).where(Enrollment.course_id.in_(_matching_courses(search))))
             )
         )
-    enquiries = enquiries_query.all()
-
-    notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).order_by(Notification.timestamp.desc()).all()
-
-    # Calculate statistics (exclude cancelled enrollments)
-    stats = {
-        "total_users": len(users),
-        "total_courses": len(courses),
-        "total_enrollments": Enrollment.query.filter(Enrollment.status != 'cancelled').count(),
-        "total_revenue": sum(p.amount for p in payments if p.status == 'completed')
+    return query
+
+def _certificates_query(search):
+    query = Certificate.query
+    if search:
+        query = query.filter(substring_filter(Certificate, ('username', 'course_title'), search))
+    return query
+
+def _enquiries_query(search):
+    query = Enquiry.query
+    if search:
+        query = query.filter(substring_filter(Enquiry, ('name', 'email', 'course', 'message'), search))
+    return query
+
+# Per section: search argument, query builder, id column, allowed sort keys
+# (the first one is the default), optional exact-match filters (argument ->
+# column, comma-separated values), eager loads and serializer.
+PANEL_SECTIONS = {
+    "users": {
+        "search_arg": "search_user",
+        "query": _users_query,
+        "id": User.id,
+        "sort_keys": {"created_on": User.created_on, "username": User.username, "email": User.email},
+        "filters": {"role": User.role, "status": User.status},
+        "options": [],
+        "serialize": _serialize_user,
+    },
+    "courses": {
+        "search_arg": "search_course",
+        "query": _courses_query,
+        "id": Course.id,
+        "sort_keys": {"title": Course.title, "fee": Course.fee},
+        "options": [],
+        "serialize": _serialize_course,
+    },
+    "enrollments": {
+        "search_arg": "search_enrollment",
+        "query": _enrollments_query,
+        "id": Enrollment.id,
+        "sort_keys": {"enrolled_on": Enrollment.enrolled_on, "status": Enrollment.status},
+        "options": [db.joinedload(Enrollment.course), db.joinedload(Enrollment.user)],
+        "serialize": _serialize_enrollment,
+    },
+    "payments": {
+        "search_arg": "search_payment",
+        "query": _payments_query,
+        "id": Payment.id,
+        "sort_keys": {"created_on": Payment.created_on, "amount": Payment.amount},
+        "options": [db.joinedload(Payment.user), db.joinedload(Payment.enrollment).joinedload(Enrollment.course)],
+        "serialize": _serialize_payment,
+    },
+    "certificates": {
+        "search_arg": "search_certificate",
+        "query": _certificates_query,
+        "id": Certificate.id,
+        "sort_keys": {"date": Certificate.date, "username": Certificate.username},
+        "options": [],
+        "serialize": _serialize_certificate,
+    },
+    "enquiries": {
+        "search_arg": "search_enquiry",
+        "query": _enquiries_query,
+        "id": Enquiry.id,
+        "sort_keys": {"created_on": Enquiry.created_on, "name": Enquiry.name},
+        "options": [],
+        "serialize": _serialize_enquiry,
+    },
+}
+
+def _panel_section_page(name, args, after=None):
+    """Build one keyset page of a panel section plus its SQL-side totals."""
+    section = PANEL_SECTIONS[name]
+    query = section["query"](args.get(section["search_arg"], '').strip())
+    for arg, column in section.get("filters", {}).items():
+        if args.get(arg):
+            query = query.filter(column.in_(args[arg].split(',')))
+
+    sort_key = args.get('sort') or next(iter(section["sort_keys"]))
+    if sort_key not in section["sort_keys"]:
+        raise InvalidPageRequest(f"Invalid sort key '{sort_key}' for {name}")
+    sort_column = section["sort_keys"][sort_key]
+    descending = args.get('order', 'desc') != 'asc'
+    limit = parse_limit(args.get('limit'))
+
+    totals = {"count": query.order_by(None).count()}
+    if name == "payments":
+        totals["completed_amount"] = query.order_by(None).with_entities(
+            db.func.coalesce(db.func.sum(db.case((Payment.status == 'completed', Payment.amount), else_=0)), 0)
+        ).scalar()
+
+    items, next_cursor = keyset_page(
+        query.options(*section["options"]), sort_column, section["id"],
+        limit, after=after, descending=descending
+    )
+    page = {
+        "limit": limit,
+        "sort": sort_key,
+        "order": "desc" if descending else "asc",
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "totals": totals,
     }
+    return items, [section["serialize"](item) for item in items], page
 
-    # Calculate dues for each active enrollment
-    enrollment_dues = {}
-    for enrollment in enrollments:
-        if enrollment.status == 'active':
-            # Calculate total paid for this enrollment
-            total_paid = db.session.query(db.func.sum(Payment.amount)).filter(
-                Payment.enrollment_id == enrollment.id,
-                Payment.status == 'completed'
-            ).scalar() or 0
-            due = enrollment.course.fee - total_paid
-            if due > 0:
-                enrollment_dues[enrollment.id] = due
-
-    # Serialize data
-    users_data = [
-        {
-            "id": u.id,
-            "username": u.username,
-            "email": u.email,
-            "full_name": u.full_name,
-            "mobile_number": u.mobile_number,
-            "discount": u.discount,
-            "referred_by": u.referred_by,
-            "role": u.role,
-            "status": u.status,
-            "created_on": u.created_on.strftime('%Y-%m-%d %H:%M:%S') if u.created_on else None
-        } for u in users
-    ]
-
-    courses_data = [
-        {
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "fee": c.fee,
-            "category": c.category,
-            "type": c.type,
-            "image_file": c.image_file
-        } for c in courses
-    ]
-
-    enrollments_data = [
-        {
-            "id": e.id,
-            "user_id": e.user_id,
-            "course_id": e.course_id,
-            "status": e.status,
-            "enrolled_on": e.enrolled_on.strftime('%Y-%m-%d %H:%M:%S') if e.enrolled_on else None,
-            "course": {
-                "title": e.course.title if e.course else None
-            },
-            "user": {
-                "username": e.user.username if e.user else None,
-                "full_name": e.user.full_name if e.user else None
-            }
-        } for e in enrollments
-    ]
-
-    payments_data = [
-        {
-            "id": p.id,
-            "user_id": p.user_id,
-            "enrollment_id": p.enrollment_id,
-            "amount": p.amount,
-            "status": p.status,
-            "created_on": p.created_on.strftime('%Y-%m-%d %H:%M:%S') if p.created_on else None,
-            "user": {
-                "username": p.user.username if p.user else None,
-                "full_name": p.user.full_name if p.user else None
-            },
-            "enrollment": {
-                "course": {
-                    "title": p.enrollment.course.title if p.enrollment and p.enrollment.course else None
-                }
-            }
-        } for p in payments
-    ]
-
-    certificates_data = [
-        {
-            "id": cert.id,
-            "username": cert.username,
-            "course_title": cert.course_title,
-            "date": cert.date.strftime('%Y-%m-%d') if cert.date else None
-        } for cert in certificates
-    ]
-
-    enquiries_data = [
-        {
-            "id": eq.id,
-            "name": eq.name,
-            "email": eq.email,
-            "phone": eq.phone,
-            "course": eq.course,
-            "message": eq.message,
-            "created_on": eq.created_on.strftime('%Y-%m-%d %H:%M:%S') if eq.created_on else None
-        } for eq in enquiries
-    ]
-
-    notifications_data = [
-        {
-            "id": n.id,
-            "message": n.message,
-            "timestamp": n.timestamp.isoformat(),
-            "is_read": n.is_read
-        } for n in notifications
-    ]
+@admin_bp.route("/api/panel")
+@login_required
+def admin_api_panel():
+    print("admin_api_panel function hit!") # Added logging
+    if current_user.role not in ['admin', 'main_admin']:
+        return jsonify({"success": False, "message": "Unauthorized access"}), 403
 
-    return jsonify({
-        "success": True,
-        "stats": stats,
-        "users": users_data,
-        "courses": courses_data,
-        "enrollments": enrollments_data,
-        "payments": payments_data,
-        "certificates": certificates_data,
-        "enquiries": enquiries_data,
-        "enrollment_dues": enrollment_dues,
-        "notifications": notifications_data
-    })
+    # ?section=payments fetches a single entity; `after` only applies there,
+    # since each section has its own cursor.
+    section = request.args.get('section')
+    if section and section not in PANEL_SECTIONS:
+        return jsonify({"success": False, "message": f"Unknown section '{section}'"}), 400
+    sections = [section] if section else list(PANEL_SECTIONS)
+
+    response = {"success": True, "pages": {}}
+    try:
+        for name in sections:
+            items, data, page = _panel_section_page(name, request.args, after=request.args.get('after') if section else None)
+            response[name] = data
+            response["pages"][name] = page
+            if name == "enrollments":
+                # Dues only for the enrollments on this page
+                response["enrollment_dues"] = calculate_enrollment_dues(Enrollment.id.in_([e.id for e in items]))
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    if not section:
+        notifications = user_notifications(current_user, unread_only=True)
+
+        # Calculate statistics (exclude cancelled enrollments)
+        response["stats"] = get_dashboard_stats()
+        response["notifications"] = [
+            {
+                "id": n.id,
+                "message": n.message,
+                "timestamp": n.timestamp.isoformat(),
+                "is_read": n.is_read
+            } for n in notifications
+        ]
+
+    return jsonify(response)
+
+@admin_bp.route("/api/chat-intents")
+@login_required
+def admin_chat_intent_stats():
+    if current_user.role not in ['admin', 'main_admin']:
+        return jsonify({"success": False, "message": "Unauthorized access"}), 403
+    # Counters are per worker process and reset when the intents are reloaded
+    return jsonify({"success": True, **intent_engine.stats()})
 
 @admin_bp.route("/users/status/<int:user_id>/<action>")
 @login_required
@@ -404,6 +438,7 @@ def admin_add_course():
             new_course = Course(title=title, description=description, fee=fee, category=category, type=type_value, image_file=filename)
             db.session.add(new_course)
             db.session.commit()
+            course_catalog.invalidate()
             return jsonify({"success": True, "message": "Course added successfully", "course": {"id": new_course.id, "title": new_course.title, "description": new_course.description, "fee": new_course.fee, "category": new_course.category, "image_file": new_course.image_file}})
         except ValueError:
             return jsonify({"success": False, "message": "Invalid fee value"})
@@ -471,13 +506,11 @@ def admin_edit_course():
                 current_app.logger.info(f"Image updated for course {course.id}: {filename}")
 
             db.session.commit()
+            course_catalog.invalidate()
             current_app.logger.info(f"Course updated: ID {course.id}, Title '{course.title}'")
 
             # Notify all students enrolled in the course about the update
-            enrolled_students = Enrollment.query.filter_by(course_id=course.id, status='active').all()
-            for enrollment in enrolled_students:
-                notification = Notification(user_id=enrollment.user_id, message=f"The course '{course.title}' has been updated.")
-                db.session.add(notification)
+            notify_course_students(course.id, f"The course '{course.title}' has been updated.")
             db.session.commit()
 
             return jsonify({"success": True, "message": "Course updated successfully", "course": {"id": course.id, "title": course.title, "description": course.description, "fee": course.fee, "category": course.category, "type": course.type, "image_file": course.image_file}})
@@ -491,7 +524,7 @@ def admin_edit_course():
     else:
         return jsonify({"success": False, "message": "All fields are required"})
 
-@admin_bp.route("/courses/delete/<int:course_id>")
+@admin_bp.route("/courses/delete/<course_id>", methods=["GET", "POST"])
 @login_required
 def admin_delete_course(course_id):
     if current_user.role not in ['admin', 'main_admin']:
@@ -500,6 +533,7 @@ def admin_delete_course(course_id):
     if course:
         db.session.delete(course)
         db.session.commit()
+        course_catalog.invalidate()
         return jsonify({"success": True, "message": "Course deleted successfully"})
     else:
         return jsonify({"success": False, "message": "Course not found"}), 404
@@ -521,13 +555,20 @@ def admin_delete_user(user_id):
         Payment.query.filter_by(user_id=user_id).delete()
         Referral.query.filter_by(user_id=user_id).delete()
         Notification.query.filter_by(user_id=user_id).delete()
+        NotificationReceipt.query.filter_by(user_id=user_id).delete()
         from models import GameScore, UserSeenQuestion
+        from services.score_ranks import forget_scores
+        forget_scores(GameScore.user_id == user_id)
         GameScore.query.filter_by(user_id=user_id).delete()
         UserSeenQuestion.query.filter_by(user_id=user_id).delete()
 
         # Delete the user
         db.session.delete(user)
         db.session.commit()
+
+        # The bulk deletes above skip the counter bookkeeping
+        if counters_enabled():
+            rebuild_counters()
         return jsonify({"success": True, "message": "User deleted successfully"})
     else:
         return jsonify({"success": False, "message": "User not found"}), 404
@@ -766,16 +807,24 @@ def admin_get_course(course_id):
 @admin_bp.route('/notifications')
 @login_required
 def notifications():
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.timestamp.desc()).all()
+    notifications = user_notifications(current_user)
     return jsonify([{'id': n.id, 'message': n.message, 'timestamp': n.timestamp.isoformat(), 'is_read': n.is_read} for n in notifications])
 
+@admin_bp.route('/notifications/poll')
+@login_required
+def poll_notifications():
+    return poll_notifications_response(current_user)
+
+@admin_bp.route('/notifications/stream')
+@login_required
+def stream_notifications():
+    return stream_notifications_response(current_user)
+
 @admin_bp.route('/notifications/mark_read', methods=['POST'])
 @login_required
 def mark_notification_read():
     notification_id = request.json.get('id')
-    notification = Notification.query.get(notification_id)
-    if notification and notification.user_id == current_user.id:
-        notification.is_read = True
+    if mark_read(current_user, notification_id):
         db.session.commit()
         return jsonify({'success': True})
     return jsonify({'success': False}), 404
@@ -783,7 +832,7 @@ def mark_notification_read():
 @admin_bp.route('/notifications/clear_all', methods=['POST'])
 @login_required
 def clear_all_notifications():
-    Notification.query.filter_by(user_id=current_user.id).delete()
+    dismiss_all(current_user)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -796,33 +845,4 @@ def admin_download_certificate(cert_id):
         return redirect(url_for("main.home"))
     certificate = Certificate.query.get_or_404(cert_id)
 
-    # Generate PDF certificate
-    from io import BytesIO
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet
-    buffer = BytesIO()
-    doc = canvas.Canvas(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-
-    # Title
-    doc.setFont("Helvetica-Bold", 24)
-    doc.drawCentredString(300, 750, "Certificate of Completion")
-
-    # Certificate content
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 650, "This is to certify that")
-    doc.setFont("Helvetica-Bold", 18)
-    doc.drawCentredString(300, 600, certificate.username)
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 550, "has successfully completed the course")
-    doc.setFont("Helvetica-Bold", 16)
-    doc.drawCentredString(300, 500, certificate.course_title)
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 450, f"on {certificate.date.strftime('%B %d, %Y')}")
-
-    doc.save()
-    buffer.seek(0)
-
-    from flask import send_file
-    return send_file(buffer, as_attachment=True, download_name=f"certificate_{certificate.id}.pdf", mimetype='application/pdf')
+    return send_certificate(certificate)
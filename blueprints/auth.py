@@ -4,8 +4,8 @@ from flask_bcrypt import Bcrypt
 from flask_login import login_user, logout_user, current_user, login_required
 from itsdangerous import URLSafeTimedSerializer
 from models import db, User, Referral
-from utils import generate_otp, generate_referral_code, send_username_email, send_otp_email
-from flask_mail import Message
+from services.rate_limit import rate_limit, request_field
+from utils import generate_otp, generate_referral_code, send_username_email, send_otp_email, send_password_reset_email
 
 auth_bp = Blueprint('auth', __name__)
 bcrypt = Bcrypt()
@@ -48,6 +48,7 @@ def login():
     return render_template("auth.html", mode="login")
 
 @auth_bp.route("/send_login_otp", methods=["POST"])
+@rate_limit('login_otp', account=request_field('email'))
 def send_login_otp():
     email = request.json.get("email")
     user = User.query.filter_by(email=email).first()
@@ -59,6 +60,7 @@ def send_login_otp():
     return jsonify({"success": False, "message": "Email not found"})
 
 @auth_bp.route("/signup", methods=["GET", "POST"])
+@rate_limit('signup', account=request_field('email'))
 def signup():
     if request.method == "POST":
         is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
@@ -192,15 +194,8 @@ def forgot_password():
         if user:
             s = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
             token = s.dumps(user.email, salt='password-reset-salt')
-            msg = Message('Password Reset Request',
-                          sender=current_app.config['MAIL_USERNAME'],
-                          recipients=[user.email])
             reset_url = url_for('auth.reset_with_token', token=token, _external=True)
-            msg.body = f'''To reset your password, visit the following link:
-{reset_url}
-If you did not make this request then simply ignore this email and no changes will be made.
-'''
-            current_app.extensions['mail'].send(msg)
+            send_password_reset_email(user.email, reset_url)
             flash("A password reset link has been sent to your email.", "info")
             return redirect(url_for("auth.login"))
         else:
@@ -1,35 +1,26 @@
-import re
 from flask import Blueprint, render_template, request, jsonify, current_app
-from models import db, Enquiry, Notification, User
+from models import db, Enquiry
+from services.notifications import notify_admins
+from services.chat_intents import intent_engine
+from services.chat_catalog import catalog_answer
+from services.rate_limit import logged_in_user, rate_limit, request_field
 
 chat_bp = Blueprint('chat', __name__)
 
 # ---------- CHAT ----------
 def generate_chat_response(message):
-    """Generate a response based on predefined rules."""
-    message = message.lower()
-
-    rules = {
-        r"(hi|hello|hey)": "Hello! How can I help you with Vidyasetu?",
-        r"(what|which|show me the|tell me about).*\bcourses?\b": "We offer a variety of courses including Python Programming, Web Development, and Data Science. You can find more details on our courses page.",
-        r"(fee|price|cost|how much)": "The fee for our courses varies. For example, Python Programming is ₹3000, Web Development is ₹3500, and Data Science is ₹4000. For more details, please visit the courses page.",
-        r"(enroll|enrollment|register|how to join)": "You can enroll in our courses by visiting the courses page, selecting a course, and clicking the 'Enroll' button. You will need to create an account if you don't have one.",
-        r"(about|who are you|tell me about vidyasetu)": "We are Vidyasetu, India's premier offline computer coaching center. We offer hands-on computer education with expert instructors.",
-        r"(contact|support|talk to someone)": "You can contact us through the contact page on our website or by using the chat widget.",
-        r"(bye|goodbye|see you)": "Goodbye! Have a great day!",
-    }
-
-    for pattern, response in rules.items():
-        if re.search(pattern, message):
-            return response, False
-
-    return "I'm sorry, I can only assist with questions about Vidyasetu. Please share your details below and our team will contact you with a solution!", True
+    """Generate a response from the compiled chat intents."""
+    intent = intent_engine.match(message)
+    # Course, fee, category and level questions are answered from the live catalog
+    reply = catalog_answer(intent.catalog, message) if intent.catalog else None
+    return reply or intent.response, intent.escalate
 
 def get_chat_response(message):
     """Always use AI response with comprehensive website information"""
     return generate_chat_response(message)
 
 @chat_bp.route("/", methods=["GET", "POST"])
+@rate_limit('chat', account=logged_in_user, body=lambda message: {"reply": message, "escalate": False})
 def chat():
     if request.method == "POST":
         try:
@@ -47,6 +38,7 @@ def chat():
     return render_template("chat.html")
 
 @chat_bp.route("/escalate", methods=["POST"])
+@rate_limit('chat_escalate', account=request_field('email'))
 def chat_escalate():
     try:
         data = request.json
@@ -61,10 +53,7 @@ def chat_escalate():
         db.session.commit()
 
         # Notify all admins about the escalated query
-        admins = User.query.filter(User.role.in_(['admin', 'main_admin'])).all()
-        for admin in admins:
-            notification = Notification(user_id=admin.id, message=f"New escalated chat query from {name}: {problem}")
-            db.session.add(notification)
+        notify_admins(f"New escalated chat query from {name}: {problem}")
         db.session.commit()
 
         return jsonify({"success": True, "message": "Query escalated to admin"})
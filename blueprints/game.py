@@ -2,7 +2,13 @@ import json
 import requests
 from flask import Blueprint, render_template, request, jsonify, current_app
 from flask_login import current_user
-from models import db, GameScore, Question, UserSeenQuestion, Leaderboard, User
+from datetime import datetime
+from models import db, GameScore, Question, UserSeenQuestion, User
+from services.leaderboards import GAME_CATEGORIES, leaderboard_response, record_score
+from services.score_ranks import best_scores, score_rank
+from services.question_bank import DEFAULT_DRAW_SIZE, MAX_MARK_SEEN_BATCH, question_bank, questions_response, record_seen
+from services.question_generation import DIFFICULTIES, MAX_GENERATE_COUNT, PROMPTS, question_generator
+from services.rate_limit import logged_in_user, rate_limit
 
 game_bp = Blueprint('game', __name__)
 
@@ -30,6 +36,10 @@ def save_score():
 
     if not all([game_type, score is not None]):
         return jsonify({"success": False, "message": "Missing required fields"}), 400
+    try:
+        score = int(score)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "Invalid score"}), 400
 
     # Determine role and user_id
     if current_user.is_authenticated:
@@ -57,19 +67,15 @@ def save_score():
         username=display_username,
         role=role,
         game_type=game_type,
-        score=score
+        score=score,
+        created_at=datetime.utcnow()
     )
 
     try:
         db.session.add(game_score)
 
-        # Also save to Leaderboard table for display
-        leaderboard_entry = Leaderboard(
-            game_category=game_type,
-            user_name=display_name,
-            score=score
-        )
-        db.session.add(leaderboard_entry)
+        # Update the top-K boards this score makes it onto
+        record_score(game_type, display_name, score, game_score.created_at)
 
         db.session.commit()
         return jsonify({"success": True, "message": "Score saved successfully"})
@@ -96,33 +102,14 @@ def verify_username():
 def get_questions():
     category = request.args.get('category')
     difficulty = request.args.get('difficulty')
-    user_id_str = request.args.get('user_id')
+    user_id = request.args.get('user_id')  # Guest id or user id, both strings
 
-    if not all([category, difficulty, user_id_str]):
+    if not all([category, difficulty, user_id]):
         return jsonify({"error": "Missing required parameters"}), 400
 
-    try:
-        user_id = int(user_id_str)
-    except ValueError:
-        return jsonify({"error": "Invalid user_id"}), 400
-
-    # Get questions for category and difficulty, excluding seen ones
-    seen_question_ids = db.session.query(UserSeenQuestion.question_id).filter_by(user_id=user_id).subquery()
-
-    questions = Question.query.filter_by(game_category=category, difficulty=difficulty).filter(~Question.id.in_(seen_question_ids)).order_by(db.func.random()).limit(10).all()
-
-    # Format questions for response
-    question_data = []
-    for q in questions:
-        options = json.loads(q.options)
-        question_data.append({
-            "question_id": q.id,
-            "question_text": q.question_text,
-            "options": options,
-            "correct_answer": q.correct_answer
-        })
-
-    return jsonify({"questions": question_data})
+    # Draw unseen questions from the cached bank; the response is built from pre-serialized payloads
+    records = question_bank.draw(user_id, category, difficulty, DEFAULT_DRAW_SIZE)
+    return questions_response(records)
 
 @game_bp.route("/api/mark-seen", methods=["POST"])
 def mark_question_seen():
@@ -133,15 +120,38 @@ def mark_question_seen():
     if not all([user_id, question_id]):
         return jsonify({"error": "Missing required parameters"}), 400
 
-    # Check if already marked as seen
-    existing = UserSeenQuestion.query.filter_by(user_id=user_id, question_id=question_id).first()
-    if not existing:
-        seen_entry = UserSeenQuestion(user_id=user_id, question_id=question_id)
-        db.session.add(seen_entry)
-        db.session.commit()
+    record_seen(user_id, [question_id])
+    db.session.commit()
+    question_bank.mark_seen(user_id, [question_id])
 
     return jsonify({"success": True})
 
+@game_bp.route("/api/mark-seen/batch", methods=["POST"])
+def mark_questions_seen():
+    data = request.json or {}
+    user_id = data.get('user_id')
+    question_ids = data.get('question_ids')
+
+    if not user_id or not isinstance(question_ids, list) or not question_ids:
+        return jsonify({"error": "Missing required parameters"}), 400
+    if len(question_ids) > MAX_MARK_SEEN_BATCH:
+        return jsonify({"error": f"At most {MAX_MARK_SEEN_BATCH} question ids per request"}), 400
+    if not all(isinstance(question_id, str) for question_id in question_ids):
+        return jsonify({"error": "Invalid question ids"}), 400
+
+    recorded, unknown = record_seen(user_id, question_ids)
+    db.session.commit()
+    question_bank.mark_seen(user_id, question_ids)
+
+    unique = len(set(question_ids))
+    return jsonify({
+        "success": True,
+        "received": len(question_ids),
+        "recorded": recorded,
+        "already_seen": unique - recorded - unknown,
+        "unknown": unknown
+    })
+
 @game_bp.route("/api/leaderboard", methods=["GET", "POST"])
 def leaderboard():
     if request.method == "POST":
@@ -153,28 +163,46 @@ def leaderboard():
 
         if not all([game_category, user_name, score is not None]):
             return jsonify({"error": "Missing required parameters"}), 400
+        try:
+            score = int(score)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid score"}), 400
 
-        leaderboard_entry = Leaderboard(game_category=game_category, user_name=user_name, score=score)
-        db.session.add(leaderboard_entry)
+        # Stored as a guest score so the boards can always be rebuilt from game_score
+        game_score = GameScore(name=user_name, role='guest', game_type=game_category, score=score, created_at=datetime.utcnow())
+        db.session.add(game_score)
+        record_score(game_category, user_name, score, game_score.created_at)
         db.session.commit()
 
         return jsonify({"success": True})
 
-    else:
-        # Get leaderboard data
-        leaderboard_data = {}
-        game_types = ['code-quiz', 'speed-typing', 'cyber-security', 'data-science', 'web-dev', 'ai-ml']
+    # Every category and period from one cached snapshot
+    return leaderboard_response()
 
-        for game_type in game_types:
-            scores = Leaderboard.query.filter_by(game_category=game_type).order_by(Leaderboard.score.desc()).limit(10).all()
+@game_bp.route("/api/rank")
+def rank():
+    game_type = request.args.get('game_type')
+    score = request.args.get('score')
+    username = request.args.get('username', '').strip()
 
-            leaderboard_data[game_type] = [{
-                'user_name': score.user_name,
-                'score': score.score,
-                'created_at': score.created_at.isoformat()
-            } for score in scores]
+    if game_type and game_type not in GAME_CATEGORIES:
+        return jsonify({"success": False, "message": "Invalid game type"}), 400
+    game_types = [game_type] if game_type else list(GAME_CATEGORIES)
+
+    if score is not None:
+        try:
+            scores = {gt: int(score) for gt in game_types}
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid score"}), 400
+    elif current_user.is_authenticated:
+        scores = best_scores(user_id=current_user.id)
+    elif username:
+        scores = best_scores(username=username)
+    else:
+        return jsonify({"success": False, "message": "Log in, or pass a score or username"}), 400
 
-        return jsonify({"leaderboard": leaderboard_data})
+    ranks = {gt: score_rank(gt, scores[gt]) for gt in game_types if gt in scores}
+    return jsonify({"success": True, "ranks": ranks})
 
 @game_bp.route("/api/me")
 def get_current_user():
@@ -187,6 +215,7 @@ def get_current_user():
         return jsonify({"error": "Not authenticated"}), 401
 
 @game_bp.route("/api/generate_questions", methods=["POST"])
+@rate_limit('generate_questions', account=logged_in_user)
 def generate_questions():
     data = request.json
     game_type = data.get('game_type')
@@ -195,59 +224,16 @@ def generate_questions():
 
     if not game_type:
         return jsonify({"success": False, "message": "Game type is required"}), 400
-
-    # Define prompts for each game type
-    prompts = {
-        'code-quiz': f"Generate {count} multiple-choice questions about programming concepts (HTML, CSS, JavaScript, Python) for {difficulty} difficulty. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
-        'ai-ml': f"Generate {count} multiple-choice questions about Artificial Intelligence and Machine Learning for {difficulty} difficulty. Cover neural networks, algorithms, applications. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
-
-        'cyber-security': f"Generate {count} multiple-choice questions about cybersecurity concepts for {difficulty} difficulty. Cover topics like passwords, phishing, encryption, etc. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
-        'data-science': f"Generate {count} multiple-choice questions about data science and analytics for {difficulty} difficulty. Cover statistics, data visualization, machine learning basics. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
-        'web-dev': f"Generate {count} multiple-choice questions about web development for {difficulty} difficulty. Cover HTML, CSS, JavaScript, frameworks. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
-        'speed-typing': "This game type doesn't use questions, skip."
-    }
-
-    prompt = prompts.get(game_type)
-    if not prompt or prompt == "This game type doesn't use questions, skip.":
+    if game_type not in PROMPTS:
         return jsonify({"success": False, "message": "Invalid game type"}), 400
+    if difficulty not in DIFFICULTIES:
+        return jsonify({"success": False, "message": f"Difficulty must be one of {', '.join(DIFFICULTIES)}"}), 400
+    if not isinstance(count, int) or not (1 <= count <= MAX_GENERATE_COUNT):
+        return jsonify({"success": False, "message": f"Count must be an integer 1-{MAX_GENERATE_COUNT}"}), 400
 
     try:
-        headers = {
-            "Authorization": f"Bearer {current_app.config.get('SABANOVA_API_KEY', '')}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "gpt-3.5-turbo",  # Assuming Sabanova supports this
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant that generates educational quiz questions. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 2000,
-            "temperature": 0.7
-        }
-
-        response = requests.post(current_app.config.get('SABANOVA_API_URL', ''), headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-
-        result = response.json()
-        content = result['choices'][0]['message']['content']
-
-        # Parse the JSON response
-        questions = json.loads(content)
-
-        # Validate the structure
-        if not isinstance(questions, list):
-            raise ValueError("Response is not a list")
-
-        for q in questions:
-            if not all(key in q for key in ['question', 'options', 'correct']):
-                raise ValueError("Invalid question structure")
-            if not isinstance(q['options'], list) or len(q['options']) != 4:
-                raise ValueError("Options must be a list of 4 items")
-            if not isinstance(q['correct'], int) or not (0 <= q['correct'] <= 3):
-                raise ValueError("Correct answer must be an integer 0-3")
-
+        # Prefetched or cached questions when available; the API call is the fallback
+        questions = question_generator.get(game_type, difficulty, count)
         return jsonify({"success": True, "questions": questions})
 
     except requests.exceptions.RequestException as e:
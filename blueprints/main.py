@@ -28,8 +28,13 @@ from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from itsdangerous import URLSafeTimedSerializer
 import threading
 
-from models import db, User, AdminCourseAccess, Course, Enrollment, Payment, Certificate, Referral, Enquiry, Notification, GameScore, Question, UserSeenQuestion, Leaderboard
+from models import db, User, AdminCourseAccess, Course, Enrollment, Payment, Certificate, Referral, Enquiry, Notification, GameScore, Question, UserSeenQuestion
 from utils import generate_otp, generate_referral_code, send_username_email
+from services.stats import get_dashboard_stats
+from services.catalog import get_courses
+from services.notifications import notify_admins, user_notifications
+from services.rate_limit import rate_limit, request_field
+from services.search import MAX_SUGGESTIONS, search_courses, suggest
 
 main_bp = Blueprint('main', __name__)
 
@@ -62,27 +67,19 @@ def allowed_file(filename):
 # ---------------- ROUTES ----------------
 @main_bp.route("/")
 def home():
-    courses = Course.query.all()
+    courses = get_courses()
 
     # Dynamic content based on user role
     if current_user.is_authenticated:
         if current_user.role in ['admin', 'main_admin']:
             # Admin dashboard data
-            users = User.query.all()
-            enrollments = Enrollment.query.all()
-            payments = Payment.query.all()
             enquiries = Enquiry.query.all()
-            notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).order_by(Notification.timestamp.desc()).all()
+            notifications = user_notifications(current_user, unread_only=True)
 
             # Calculate statistics
-            stats = {
-                "total_users": len(users),
-                "total_courses": len(courses),
-                "total_enrollments": len(enrollments),
-                "total_revenue": sum(p.amount for p in payments if p.status == 'completed')
-            }
-
-            return render_template("home/home.html", courses=courses, stats=stats, users=users, enrollments=enrollments, payments=payments, enquiries=enquiries, notifications=notifications, user_role='admin')
+            stats = get_dashboard_stats()
+
+            return render_template("home/home.html", courses=courses, stats=stats, enquiries=enquiries, notifications=notifications, user_role='admin')
         else:
             # Student dashboard data
             enrollments = Enrollment.query.filter_by(user_id=current_user.id, status='active').all()
@@ -99,7 +96,7 @@ def about():
 
 @main_bp.route("/courses")
 def courses():
-    courses = Course.query.all()
+    courses = get_courses()
     enrollments = []
     if current_user.is_authenticated and current_user.role == 'student':
         enrollments = Enrollment.query.filter_by(user_id=current_user.id).all()
@@ -114,6 +111,7 @@ def contact():
     return render_template("home/contact.html")
 
 @main_bp.route("/enquiry", methods=["POST"])
+@rate_limit('enquiry', account=request_field('email'))
 def enquiry():
     try:
         name = request.form.get("name")
@@ -127,10 +125,7 @@ def enquiry():
         db.session.commit()
 
         # Notify all admins about the enquiry
-        admins = User.query.filter(User.role.in_(['admin', 'main_admin'])).all()
-        for admin in admins:
-            notification = Notification(user_id=admin.id, message=f"New enquiry from {name} for course '{course}'.")
-            db.session.add(notification)
+        notify_admins(f"New enquiry from {name} for course '{course}'.")
         db.session.commit()
 
         return jsonify({"success": True, "message": "Your enquiry has been submitted successfully!"})
@@ -154,6 +149,20 @@ def enroll(course_id):
 
 @main_bp.route("/search")
 def search():
-    query = request.args.get("query")
-    courses = Course.query.filter(Course.title.ilike(f'%{query}%')).all()
-    return render_template("search_results.html", courses=courses, query=query)
+    query = (request.args.get("query") or "").strip()
+    courses = search_courses(query) if query else []
+    enrollments = []
+    if current_user.is_authenticated and current_user.role == 'student':
+        enrollments = Enrollment.query.filter_by(user_id=current_user.id).all()
+    return render_template("home/courses.html", courses=courses, enrollments=enrollments, query=query)
+
+@main_bp.route("/api/search/suggest")
+def search_suggest():
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"success": True, "query": query, "suggestions": []})
+    try:
+        limit = min(int(request.args.get("limit", MAX_SUGGESTIONS)), MAX_SUGGESTIONS)
+    except ValueError:
+        return jsonify({"success": False, "message": "limit must be an integer"}), 400
+    return jsonify({"success": True, "query": query, "suggestions": suggest(query, max(limit, 1))})
@@ -7,6 +7,10 @@ from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from models import db, User, Course, Enrollment, Payment, Certificate, Referral, Notification
 from blueprints.main import allowed_file
+from services.ledger import calculate_enrollment_dues
+from services.catalog import get_courses
+from services.notifications import mark_all_read, notify_admins, poll_notifications_response, stream_notifications_response
+from services.certificates import send_certificate
 
 student_bp = Blueprint('student', __name__)
 
@@ -17,25 +21,15 @@ def student_dashboard():
     if current_user.role != 'student':
         return redirect(url_for("main.home"))
     # Fetch student data
-    enrollments = Enrollment.query.filter_by(user_id=current_user.id).all()
+    enrollments = Enrollment.query.options(db.joinedload(Enrollment.course)).filter_by(user_id=current_user.id).all()
     payments = Payment.query.filter_by(user_id=current_user.id).all()
     certificates = Certificate.query.filter_by(username=current_user.username).all()
     referral = Referral.query.filter_by(user_id=current_user.id).first()
-    courses = Course.query.all()
+    courses = get_courses()
     notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).order_by(Notification.timestamp.desc()).all()
 
     # Calculate dues for each active enrollment
-    enrollment_dues = {}
-    for enrollment in enrollments:
-        if enrollment.status == 'active':
-            # Calculate total paid for this enrollment
-            total_paid = db.session.query(db.func.sum(Payment.amount)).filter(
-                Payment.enrollment_id == enrollment.id,
-                Payment.status == 'completed'
-            ).scalar() or 0
-            due = enrollment.course.fee - total_paid
-            if due > 0:
-                enrollment_dues[enrollment.id] = due
+    enrollment_dues = calculate_enrollment_dues(Enrollment.user_id == current_user.id)
 
     return render_template("student_dashboard.html",
                          enrollments=enrollments,
@@ -92,10 +86,7 @@ def student_enroll_course(course_id):
     db.session.add(notification)
 
     # Notify all admins about the enrollment request
-    admins = User.query.filter(User.role.in_(['admin', 'main_admin'])).all()
-    for admin in admins:
-        admin_notification = Notification(user_id=admin.id, message=f"New enrollment request from {current_user.username} for course '{course.title}'.")
-        db.session.add(admin_notification)
+    notify_admins(f"New enrollment request from {current_user.username} for course '{course.title}'.")
 
     db.session.commit()
 
@@ -377,36 +368,7 @@ def student_download_certificate(cert_id):
         flash("Unauthorized access", "danger")
         return redirect(url_for("student.student_dashboard"))
 
-    # Generate PDF certificate
-    from io import BytesIO
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet
-    buffer = BytesIO()
-    doc = canvas.Canvas(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-
-    # Title
-    doc.setFont("Helvetica-Bold", 24)
-    doc.drawCentredString(300, 750, "Certificate of Completion")
-
-    # Certificate content
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 650, "This is to certify that")
-    doc.setFont("Helvetica-Bold", 18)
-    doc.drawCentredString(300, 600, certificate.username)
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 550, "has successfully completed the course")
-    doc.setFont("Helvetica-Bold", 16)
-    doc.drawCentredString(300, 500, certificate.course_title)
-    doc.setFont("Helvetica", 14)
-    doc.drawCentredString(300, 450, f"on {certificate.date.strftime('%B %d, %Y')}")
-
-    doc.save()
-    buffer.seek(0)
-
-    from flask import send_file
-    return send_file(buffer, as_attachment=True, download_name=f"certificate_{certificate.id}.pdf", mimetype='application/pdf')
+    return send_certificate(certificate)
 
 @student_bp.route("/notifications")
 @login_required
@@ -421,6 +383,20 @@ def get_notifications():
         'timestamp': n.timestamp.isoformat()
     } for n in notifications])
 
+@student_bp.route("/notifications/poll")
+@login_required
+def poll_notifications():
+    if current_user.role != 'student':
+        return jsonify({"success": False, "message": "Unauthorized access"}), 403
+    return poll_notifications_response(current_user)
+
+@student_bp.route("/notifications/stream")
+@login_required
+def stream_notifications():
+    if current_user.role != 'student':
+        return jsonify({"success": False, "message": "Unauthorized access"}), 403
+    return stream_notifications_response(current_user)
+
 @student_bp.route("/notifications/mark_read", methods=["POST"])
 @login_required
 def mark_notification_read():
@@ -440,6 +416,6 @@ def mark_notification_read():
 def clear_all_notifications():
     if current_user.role != 'student':
         return jsonify({"success": False, "message": "Unauthorized access"}), 403
-    Notification.query.filter_by(user_id=current_user.id).update({'is_read': True})
+    mark_all_read(current_user)
     db.session.commit()
     return jsonify({'success': True})
@@ -51,6 +51,18 @@ def get_metadata():
     return target_db.metadata
 
 
+# Search index objects created by raw DDL (services/search.py): the SQLite
+# FTS5 tables with their shadow tables, the Postgres tsvector GIN index and
+# the pg_trgm indexes.
+# They are not in the metadata, so autogenerate would otherwise drop them.
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith(('course_fts', 'user_fts', 'certificate_fts', 'enquiry_fts')):
+        return False
+    if type_ == 'index' and (name == 'ix_course_search' or name.startswith('ix_trgm_')):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +77,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +106,8 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
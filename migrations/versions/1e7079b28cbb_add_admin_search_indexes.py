@@ -0,0 +1,81 @@
+"""Add substring search indexes for the admin panel
+
+Revision ID: 1e7079b28cbb
+Revises: 75857a9e4622
+Create Date: 2026-10-18 21:14:37.502918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e7079b28cbb'
+down_revision = '75857a9e4622'
+branch_labels = None
+depends_on = None
+
+# Same objects as services.search creates for db.create_all() databases
+TABLES = {
+    'user': ('username', 'email', 'full_name'),
+    'certificate': ('username', 'course_title'),
+    'enquiry': ('name', 'email', 'course', 'message'),
+}
+
+
+def _sqlite_upgrade(table, columns):
+    fts = f"{table}_fts"
+    listed = ", ".join(columns)
+    values = ", ".join(f"new.{column}" for column in columns)
+    insert = f"INSERT INTO {fts} (row_id, {listed}) VALUES (new.id, {values});"
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(row_id UNINDEXED, {listed}, tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON "{table}" BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {listed} ON "{table}" BEGIN '
+        f"DELETE FROM {fts} WHERE row_id = old.id; {insert} END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON "{table}" BEGIN '
+        f"DELETE FROM {fts} WHERE row_id = old.id; END",
+        f"DELETE FROM {fts}",
+        f'INSERT INTO {fts} (row_id, {listed}) SELECT id, {listed} FROM "{table}"',
+    )
+
+
+def _sqlite_downgrade(table, columns):
+    fts = f"{table}_fts"
+    return (
+        f"DROP TRIGGER IF EXISTS {fts}_delete",
+        f"DROP TRIGGER IF EXISTS {fts}_update",
+        f"DROP TRIGGER IF EXISTS {fts}_insert",
+        f"DROP TABLE IF EXISTS {fts}",
+    )
+
+
+def _postgres_upgrade(table, columns):
+    return tuple(
+        f'CREATE INDEX IF NOT EXISTS ix_trgm_{table}_{column} ON "{table}" USING gin ({column} gin_trgm_ops)'
+        for column in columns
+    )
+
+
+def _postgres_downgrade(table, columns):
+    return tuple(f"DROP INDEX IF EXISTS ix_trgm_{table}_{column}" for column in columns)
+
+
+def _run(builders, prefix=()):
+    connection = op.get_bind()
+    builder = builders.get(connection.dialect.name)
+    if builder is None:
+        return
+    statements = list(prefix if connection.dialect.name == 'postgresql' else ())
+    for table, columns in TABLES.items():
+        statements.extend(builder(table, columns))
+    for statement in statements:
+        connection.execute(sa.text(statement))
+
+
+def upgrade():
+    _run({'sqlite': _sqlite_upgrade, 'postgresql': _postgres_upgrade}, prefix=("CREATE EXTENSION IF NOT EXISTS pg_trgm",))
+
+
+def downgrade():
+    _run({'sqlite': _sqlite_downgrade, 'postgresql': _postgres_downgrade})
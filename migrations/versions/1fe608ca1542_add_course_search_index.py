@@ -0,0 +1,65 @@
+"""Add course full-text search index
+
+Revision ID: 1fe608ca1542
+Revises: 7e3c289e6850
+Create Date: 2026-10-18 18:05:12.417093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1fe608ca1542'
+down_revision = '7e3c289e6850'
+branch_labels = None
+depends_on = None
+
+# Same objects as services.search creates for db.create_all() databases
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5("
+    "course_id UNINDEXED, title, category, type, description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_insert AFTER INSERT ON course BEGIN "
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "VALUES (new.id, new.title, new.category, new.type, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_update AFTER UPDATE ON course BEGIN "
+    "DELETE FROM course_fts WHERE course_id = old.id; "
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "VALUES (new.id, new.title, new.category, new.type, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_delete AFTER DELETE ON course BEGIN "
+    "DELETE FROM course_fts WHERE course_id = old.id; END",
+    "DELETE FROM course_fts",
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "SELECT id, title, category, type, description FROM course",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS course_fts_delete",
+    "DROP TRIGGER IF EXISTS course_fts_update",
+    "DROP TRIGGER IF EXISTS course_fts_insert",
+    "DROP TABLE IF EXISTS course_fts",
+)
+
+POSTGRES_UPGRADE = (
+    "CREATE INDEX IF NOT EXISTS ix_course_search ON course USING gin ("
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(replace(category, '_', ' '), '') "
+    "|| ' ' || coalesce(type, '') || ' ' || coalesce(description, '')))",
+)
+
+POSTGRES_DOWNGRADE = (
+    "DROP INDEX IF EXISTS ix_course_search",
+)
+
+
+def _run(statements):
+    connection = op.get_bind()
+    for statement in statements.get(connection.dialect.name, ()):
+        connection.execute(sa.text(statement))
+
+
+def upgrade():
+    _run({'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRES_UPGRADE})
+
+
+def downgrade():
+    _run({'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRES_DOWNGRADE})
@@ -15,11 +15,13 @@ class User(db.Model, UserMixin):
     referred_by = db.Column(db.String(20), nullable=True)
     discount = db.Column(db.Float, default=0.0)
     mobile_number = db.Column(db.String(20), nullable=True)
-    role = db.Column(db.String(20), default='student', nullable=False)  # roles: student, admin, main_admin
+    role = db.Column(db.String(20), default='student', nullable=False, index=True)  # roles: student, admin, main_admin
     status = db.Column(db.String(20), default='pending', nullable=False) # status: pending, approved, rejected
     profile_image = db.Column(db.String(200), nullable=True)
     referral_code = db.Column(db.String(20), unique=True)
     created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    notification_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped on any change to the user's notifications
+    notifications_cleared_on = db.Column(db.DateTime, nullable=True)  # Last clear-all; pollers older than this reload everything
 
     @property
     def is_admin(self):
@@ -34,7 +36,7 @@ class AdminCourseAccess(db.Model):
 
 class Course(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    title = db.Column(db.String(100), nullable=False)
+    title = db.Column(db.String(100), nullable=False, index=True)
     description = db.Column(db.Text, nullable=True)
     fee = db.Column(db.Float, nullable=False, default=0.0)
     image_file = db.Column(db.String(200), nullable=False, default='default.jpg')
@@ -44,6 +46,12 @@ class Course(db.Model):
     level = db.Column(db.String(50), nullable=True)
 
 class Enrollment(db.Model):
+    __table_args__ = (
+        db.Index('ix_enrollment_user_id_status', 'user_id', 'status'),
+        db.Index('ix_enrollment_user_id_course_id', 'user_id', 'course_id'),
+        db.Index('ix_enrollment_course_id_status', 'course_id', 'status'),
+        db.Index('ix_enrollment_status', 'status'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     course_id = db.Column(db.String(36), db.ForeignKey('course.id'), nullable=False)
@@ -54,6 +62,11 @@ class Enrollment(db.Model):
     course = db.relationship("Course", backref="enrollments")
 
 class Payment(db.Model):
+    __table_args__ = (
+        db.Index('ix_payment_user_id', 'user_id'),
+        db.Index('ix_payment_enrollment_id_status', 'enrollment_id', 'status'),
+        db.Index('ix_payment_status', 'status'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     enrollment_id = db.Column(db.String(36), db.ForeignKey('enrollment.id'), nullable=True)
@@ -65,13 +78,13 @@ class Payment(db.Model):
 
 class Certificate(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    username = db.Column(db.String(50), nullable=False)
+    username = db.Column(db.String(50), nullable=False, index=True)
     course_title = db.Column(db.String(100), nullable=False)
     date = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Referral(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
     code = db.Column(db.String(20), unique=True, nullable=False)
     uses = db.Column(db.Integer, default=0)
     user = db.relationship("User", backref="referrals")
@@ -87,37 +100,73 @@ class Enquiry(db.Model):
     created_on = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_id_is_read_timestamp', 'user_id', 'is_read', 'timestamp'),
+        db.Index('ix_notification_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_notification_audience_timestamp', 'audience', 'timestamp'),
+        db.Index('ix_notification_user_id_updated_on', 'user_id', 'updated_on'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=True)  # Null for broadcast rows
+    audience = db.Column(db.String(20), nullable=True)  # Broadcast audience, e.g. admins; null for direct rows
     message = db.Column(db.String(255), nullable=False)
-    is_read = db.Column(db.Boolean, default=False, nullable=False)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)  # Direct rows only; broadcasts use NotificationReceipt
     timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    updated_on = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user = db.relationship("User", backref="notifications")
 
+# Per-reader read/dismissed state of a broadcast Notification
+class NotificationReceipt(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('notification_id', 'user_id', name='uq_notification_receipt_notification_id_user_id'),
+    )
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    notification_id = db.Column(db.String(36), db.ForeignKey('notification.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)
+    dismissed = db.Column(db.Boolean, default=False, nullable=False)
+    updated_on = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Read notifications moved out of the hot table by `flask archive-notifications`
+class NotificationArchive(db.Model):
+    id = db.Column(db.String(36), primary_key=True)  # Same id the notification had
+    user_id = db.Column(db.String(36), nullable=True)  # No FK: archived rows outlive their users
+    audience = db.Column(db.String(20), nullable=True)
+    message = db.Column(db.String(255), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=True)
+    archived_on = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Question(db.Model):
+    __table_args__ = (
+        db.Index('ix_question_game_category_difficulty', 'game_category', 'difficulty'),
+        db.Index('ix_question_game_category_text_hash', 'game_category', 'text_hash'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     game_category = db.Column(db.String(50), nullable=False)  # code-quiz, brain-challenge, etc.
     difficulty = db.Column(db.String(20), nullable=False)  # easy, medium, hard, expert
     question_text = db.Column(db.Text, nullable=False)
     options = db.Column(db.Text, nullable=False)  # JSON string of options array
     correct_answer = db.Column(db.Integer, nullable=False)  # Index of correct option (0-3)
+    text_hash = db.Column(db.String(40), nullable=True)  # SHA-1 of the normalized question text, for dedup
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class UserSeenQuestion(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'question_id', name='uq_user_seen_question_user_id_question_id'),
+        db.Index('ix_user_seen_question_question_id', 'question_id'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), nullable=False)  # Can be guest ID or user ID
     question_id = db.Column(db.String(36), db.ForeignKey('question.id'), nullable=False)
     seen_at = db.Column(db.DateTime, default=datetime.utcnow)
     question = db.relationship("Question", backref="seen_by_users")
 
-class Leaderboard(db.Model):
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    game_category = db.Column(db.String(50), nullable=False)
-    user_name = db.Column(db.String(100), nullable=False)
-    score = db.Column(db.Integer, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
 class GameScore(db.Model):
+    __table_args__ = (
+        db.Index('ix_game_score_user_id', 'user_id'),
+        db.Index('ix_game_score_game_type_score', 'game_type', 'score'),
+        db.Index('ix_game_score_username', 'username'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=True)  # Null for guests
     name = db.Column(db.String(100), nullable=False)  # Display name
@@ -127,3 +176,48 @@ class GameScore(db.Model):
     score = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship("User", backref="game_scores")
+
+# Number of GameScore rows per game type and score bucket, maintained by services.score_ranks
+class ScoreBucket(db.Model):
+    game_type = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)  # score // SCORE_BUCKET_WIDTH
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# Bounded top-K per game category and period, maintained by services.leaderboards
+class LeaderboardEntry(db.Model):
+    __table_args__ = (
+        db.Index('ix_leaderboard_entry_period_period_start_game_category_score', 'period', 'period_start', 'game_category', 'score'),
+    )
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    game_category = db.Column(db.String(50), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # daily, weekly, all_time
+    period_start = db.Column(db.Date, nullable=False)  # First day of the period; 1970-01-01 for all_time
+    user_name = db.Column(db.String(100), nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class StatCounter(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # users, courses, enrollments, revenue
+    value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_on = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class BootstrapMarker(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # e.g. courses
+    version = db.Column(db.Integer, nullable=False, default=0)
+    applied_on = db.Column(db.DateTime, default=datetime.utcnow)
+
+class OutboundEmail(db.Model):
+    __table_args__ = (
+        db.Index('ix_outbound_email_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    sender = db.Column(db.String(100), nullable=True)
+    recipients = db.Column(db.Text, nullable=False)  # Comma-separated addresses
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # status: pending, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Retry time, or lease expiry while sending
+    last_error = db.Column(db.Text, nullable=True)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_on = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,58 @@
+from datetime import datetime
+from models import db, Course, BootstrapMarker
+from services.stats import counters_enabled, rebuild_counters
+from services.catalog import course_catalog
+
+# Bump when DEFAULT_COURSES changes so existing databases pick up the new rows.
+COURSES_SEED_VERSION = 1
+
+DEFAULT_COURSES = [
+    {"title": "Python Programming", "description": "Learn Python basics to advanced.", "fee": 3000, "category": "programming", "type": "beginner"},
+    {"title": "Web Development", "description": "Build websites with HTML, CSS, JS.", "fee": 3500, "category": "development", "type": "intermediate"},
+    {"title": "Data Science", "description": "Data analysis & ML basics.", "fee": 4000, "category": "business", "type": "advanced"},
+]
+
+# Set once this process has seen the marker at the current version
+_bootstrapped = False
+
+def seed_courses(courses):
+    """Insert the courses whose titles are not in the catalog yet.
+
+    One IN query finds the existing titles and the missing rows go in with a
+    single executemany INSERT. Returns the number of courses added.
+    """
+    titles = [c["title"] for c in courses]
+    existing = {title for (title,) in db.session.query(Course.title).filter(Course.title.in_(titles))}
+    rows = [
+        {"title": c["title"], "description": c["description"], "fee": c["fee"], "category": c.get("category"), "type": c.get("type")}
+        for c in courses if c["title"] not in existing
+    ]
+    if rows:
+        db.session.execute(db.insert(Course), rows)
+    db.session.commit()
+
+    if rows:
+        course_catalog.invalidate()
+
+    # The executemany INSERT skips the ORM flush hooks that keep counters current
+    if rows and counters_enabled():
+        rebuild_counters()
+    return len(rows)
+
+def bootstrap_courses():
+    """Seed DEFAULT_COURSES once per COURSES_SEED_VERSION. Returns courses added."""
+    marker = db.session.get(BootstrapMarker, 'courses')
+    if marker and marker.version >= COURSES_SEED_VERSION:
+        return 0
+
+    added = seed_courses(DEFAULT_COURSES)
+    db.session.merge(BootstrapMarker(name='courses', version=COURSES_SEED_VERSION, applied_on=datetime.utcnow()))
+    db.session.commit()
+    return added
+
+def ensure_bootstrapped():
+    """Cheap guard for request handlers: only the first call per process queries."""
+    global _bootstrapped
+    if not _bootstrapped:
+        bootstrap_courses()
+        _bootstrapped = True
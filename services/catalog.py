@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import namedtuple
+from models import db, Course
+
+# Immutable, session-free snapshot of a Course row; templates read the same attributes.
+CourseRecord = namedtuple('CourseRecord', ['id', 'title', 'description', 'fee', 'image_file', 'category', 'type', 'duration', 'level'])
+
+# ---------- VERSION BACKENDS ----------
+class LocalCatalogBackend:
+    """In-process catalog version counter.
+
+    Stand-in for the shared backend: fine for a single worker and for tests.
+    With several workers each one relies on the cache TTL to see other
+    workers' writes.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        return self._version
+
+    def bump_version(self):
+        with self._lock:
+            self._version += 1
+            return self._version
+
+class RedisCatalogBackend:
+    """Catalog version counter shared by every worker through Redis."""
+
+    def __init__(self, url, key='vidyasetu:catalog:version'):
+        import redis  # optional dependency, only needed when CATALOG_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+        self._key = key
+
+    def get_version(self):
+        return int(self._client.get(self._key) or 0)
+
+    def bump_version(self):
+        return int(self._client.incr(self._key))
+
+# ---------- CATALOG CACHE ----------
+class CourseCatalog:
+    """Process-wide cache of the course catalog, invalidated by version."""
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or LocalCatalogBackend()
+        self.ttl = ttl
+        # (version, loaded_at, courses, courses_by_id), swapped as a whole
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        redis_url = app.config.get('CATALOG_REDIS_URL')
+        if redis_url:
+            self.backend = RedisCatalogBackend(redis_url)
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', self.ttl)
+        self.clear()
+
+    @property
+    def version(self):
+        return self.backend.get_version()
+
+    def _fresh_snapshot(self, version):
+        snapshot = self._snapshot
+        if snapshot and snapshot[0] == version and time.monotonic() - snapshot[1] < self.ttl:
+            return snapshot
+        return None
+
+    def _load(self, version):
+        rows = db.session.query(
+            Course.id, Course.title, Course.description, Course.fee, Course.image_file,
+            Course.category, Course.type, Course.duration, Course.level
+        ).all()
+        courses = tuple(CourseRecord(*row) for row in rows)
+        self._snapshot = (version, time.monotonic(), courses, {course.id: course for course in courses})
+        return self._snapshot
+
+    def _current(self):
+        version = self.backend.get_version()
+        snapshot = self._fresh_snapshot(version)
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._fresh_snapshot(version) or self._load(version)
+        return snapshot
+
+    def all(self):
+        """Return every course as a tuple of CourseRecord."""
+        return self._current()[2]
+
+    def get(self, course_id):
+        return self._current()[3].get(course_id)
+
+    def invalidate(self):
+        """Call after committing a catalog write so every worker reloads."""
+        self.backend.bump_version()
+        self.clear()
+
+    def clear(self):
+        self._snapshot = None
+
+course_catalog = CourseCatalog()
+
+def get_courses():
+    return course_catalog.all()
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from flask import current_app, send_file
+
+# Bump when the PDF layout changes so cached files are rendered again
+CERTIFICATE_TEMPLATE_VERSION = 1
+
+# ---------- RENDERING ----------
+def render_certificate_pdf(certificate):
+    """Draw the certificate PDF and return its bytes."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    buffer = BytesIO()
+    doc = canvas.Canvas(buffer, pagesize=A4)
+
+    # Title
+    doc.setFont("Helvetica-Bold", 24)
+    doc.drawCentredString(300, 750, "Certificate of Completion")
+
+    # Certificate content
+    doc.setFont("Helvetica", 14)
+    doc.drawCentredString(300, 650, "This is to certify that")
+    doc.setFont("Helvetica-Bold", 18)
+    doc.drawCentredString(300, 600, certificate.username)
+    doc.setFont("Helvetica", 14)
+    doc.drawCentredString(300, 550, "has successfully completed the course")
+    doc.setFont("Helvetica-Bold", 16)
+    doc.drawCentredString(300, 500, certificate.course_title)
+    doc.setFont("Helvetica", 14)
+    doc.drawCentredString(300, 450, f"on {certificate.date.strftime('%B %d, %Y')}")
+
+    doc.save()
+    return buffer.getvalue()
+
+# ---------- STORAGE ----------
+def certificate_content_hash(certificate):
+    """Hash of everything printed on the certificate plus the template version."""
+    content = "\x1f".join([
+        str(CERTIFICATE_TEMPLATE_VERSION),
+        str(certificate.id),
+        certificate.username,
+        certificate.course_title,
+        certificate.date.isoformat() if certificate.date else ''
+    ])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+def _storage_dir():
+    return current_app.config.get('CERTIFICATE_STORAGE_DIR') or os.path.join(current_app.instance_path, 'certificates')
+
+def ensure_certificate_file(certificate):
+    """Return (path, content hash) of the stored PDF, rendering it if needed.
+
+    Files live at <storage>/<certificate id>/<content hash>.pdf, so a change to
+    the certificate data yields a new file and stale ones are removed.
+    """
+    content_hash = certificate_content_hash(certificate)
+    directory = os.path.join(_storage_dir(), str(certificate.id))
+    path = os.path.join(directory, f"{content_hash}.pdf")
+    if os.path.exists(path):
+        return path, content_hash
+
+    os.makedirs(directory, exist_ok=True)
+    pdf = render_certificate_pdf(certificate)
+    # Write to a temp file and rename so concurrent downloads never see a partial PDF
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+
+    for filename in os.listdir(directory):
+        if filename.endswith('.pdf') and filename != os.path.basename(path):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+    return path, content_hash
+
+def send_certificate(certificate):
+    """Serve the stored certificate PDF with an ETag; matching If-None-Match gets a 304."""
+    path, content_hash = ensure_certificate_file(certificate)
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=f"certificate_{certificate.id}.pdf",
+        mimetype='application/pdf',
+        etag=content_hash,
+        conditional=True,
+        max_age=0
+    )
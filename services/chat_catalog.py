@@ -0,0 +1,176 @@
+import re
+import threading
+from services.catalog import course_catalog
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Words that say what is being asked rather than which course it is about
+STOPWORDS = frozenset("""
+a an and any are about can course courses do does fee fees for have how i in is it me much of offer on or
+price prices cost costs show tell the there to what which with you your level levels category categories
+kind kinds type types learn learning
+""".split())
+
+MAX_LISTED = 5
+
+def _tokens(text):
+    return TOKEN_RE.findall((text or '').replace('_', ' ').lower())
+
+def _label(value):
+    return (value or '').replace('_', ' ').title()
+
+def _level(course):
+    return (course.level or course.type or '').lower()
+
+def _fee(course):
+    return f"₹{course.fee:,.0f}"
+
+def _join(items):
+    return items[0] if len(items) == 1 else ", ".join(items[:-1]) + " and " + items[-1]
+
+def _listed(courses, describe):
+    items = [describe(course) for course in courses[:MAX_LISTED]]
+    if len(courses) > MAX_LISTED:
+        items.append(f"{len(courses) - MAX_LISTED} more")
+    return _join(items)
+
+# ---------- INDEX ----------
+class CatalogIndex:
+    """Token index over one catalog snapshot (a tuple of CourseRecord).
+
+    Title words, category and level (the `type` column, or `level` when set)
+    each map to the courses carrying them, so a chat message is resolved
+    with set lookups instead of a query.
+    """
+
+    def __init__(self, courses):
+        self.courses = courses
+        self.titles = {}      # token -> {course index}
+        self.title_sizes = []  # course index -> distinct title words
+        self.categories = {}  # category -> [course index]
+        self.levels = {}      # level -> [course index]
+        self.category_tokens = {}  # token -> {category}
+        for index, course in enumerate(courses):
+            words = {token for token in _tokens(course.title) if token not in STOPWORDS}
+            for token in words:
+                self.titles.setdefault(token, set()).add(index)
+            self.title_sizes.append(len(words))
+            if course.category:
+                self.categories.setdefault(course.category, []).append(index)
+                for token in _tokens(course.category):
+                    self.category_tokens.setdefault(token, set()).add(course.category)
+            level = _level(course)
+            if level:
+                self.levels.setdefault(level, []).append(index)
+
+    @staticmethod
+    def _lookup(token, table):
+        # Tolerate plurals: "basics" finds "basic"
+        if token in table:
+            return token
+        if token.endswith('s') and token[:-1] in table:
+            return token[:-1]
+        return None
+
+    def search(self, message):
+        """Return (courses, filtered) for the courses a message is about.
+
+        A mentioned level narrows the candidates. Among them, courses whose
+        whole title was named win, then mentioned categories, then partial
+        title matches ranked by overlap. `filtered` is False when the message
+        named nothing specific.
+        """
+        levels, categories, scores = set(), set(), {}
+        for token in {token for token in _tokens(message) if token not in STOPWORDS}:
+            if token in self.levels:
+                levels.add(token)
+                continue
+            title_token = self._lookup(token, self.titles)
+            if title_token:
+                for index in self.titles[title_token]:
+                    scores[index] = scores.get(index, 0) + 1
+            category_token = self._lookup(token, self.category_tokens)
+            if category_token:
+                categories.update(self.category_tokens[category_token])
+
+        candidates = [i for i in range(len(self.courses)) if not levels or _level(self.courses[i]) in levels]
+        named = [i for i in candidates if scores.get(i) == self.title_sizes[i]]
+        best = max((scores.get(i, 0) for i in candidates), default=0)
+        if named:
+            candidates = named
+        elif categories:
+            candidates = [i for i in candidates if self.courses[i].category in categories]
+        elif best:
+            candidates = [i for i in candidates if scores.get(i, 0) == best]
+        filtered = bool(levels or categories or best)
+        return [self.courses[i] for i in candidates], filtered
+
+_index = None
+_lock = threading.Lock()
+
+def catalog_index():
+    """The index for the current catalog snapshot, rebuilt when the snapshot changes."""
+    global _index
+    courses = course_catalog.all()
+    index = _index
+    if index is None or index.courses is not courses:
+        with _lock:
+            if _index is None or _index.courses is not courses:
+                _index = CatalogIndex(courses)
+            index = _index
+    return index
+
+# ---------- ANSWERS ----------
+def _fees_answer(index, courses, filtered):
+    if filtered:
+        return _listed(courses, lambda c: f"{c.title} is {_fee(c)}") + "."
+    ordered = sorted(index.courses, key=lambda c: c.fee)
+    return (f"Our course fees range from {_fee(ordered[0])} to {_fee(ordered[-1])}. For example, "
+            + _listed(list(index.courses), lambda c: f"{c.title} is {_fee(c)}")
+            + ". For more details, please visit the courses page.")
+
+def _courses_answer(index, courses, filtered):
+    describe = lambda c: f"{c.title} ({', '.join([part for part in (_label(_level(c)), _fee(c)) if part])})"
+    if filtered:
+        noun = "course" if len(courses) == 1 else "courses"
+        return f"We have {len(courses)} matching {noun}: {_listed(courses, describe)}."
+    categories = [_label(category) for category in index.categories]
+    across = f" across {_join(categories)}" if categories else ""
+    return (f"We offer {len(index.courses)} courses{across}, for example {_listed(list(index.courses), lambda c: c.title)}. "
+            "You can find more details on our courses page.")
+
+def _categories_answer(index, courses, filtered):
+    if not index.categories:
+        return None
+    return "Our course categories are " + _join([f"{_label(category)} ({len(members)})" for category, members in index.categories.items()]) + "."
+
+def _levels_answer(index, courses, filtered):
+    if filtered:
+        return _courses_answer(index, courses, filtered)
+    if not index.levels:
+        return None
+    return "We have courses for " + _join([f"{_label(level)} ({len(members)})" for level, members in index.levels.items()]) + " learners."
+
+ANSWERS = {
+    'courses': _courses_answer,
+    'fees': _fees_answer,
+    'categories': _categories_answer,
+    'levels': _levels_answer,
+}
+
+def catalog_answer(topic, message):
+    """Answer a course/fee/category/level question from the catalog, or None.
+
+    None (unknown topic, empty catalog, nothing matching) lets the caller
+    fall back to the intent's static response.
+    """
+    answer = ANSWERS.get(topic)
+    if answer is None:
+        return None
+    index = catalog_index()
+    if not index.courses:
+        return None
+    courses, filtered = index.search(message)
+    if filtered and not courses:
+        return None
+    return answer(index, courses, filtered)
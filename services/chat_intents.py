@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+DEFAULT_INTENTS_FILE = os.path.join(os.path.dirname(__file__), 'chat_intents.json')
+
+# catalog names a live catalog answer (services/chat_catalog.py) tried before `response`
+Intent = namedtuple('Intent', ['name', 'response', 'escalate', 'catalog'])
+
+# ---------- INTENT ENGINE ----------
+class IntentEngine:
+    """Matches chat messages against every intent in one regex pass.
+
+    Intents come from a JSON file: an ordered list of {name, patterns, response,
+    escalate, catalog} plus a fallback {response, escalate}. All patterns are compiled
+    once into a single alternation of named groups, each wrapped in a
+    lookahead so the scanner reports, at every position, the first intent in
+    file order that matches there. The earliest intent in the file matching
+    anywhere in the message wins, as with the old rule-by-rule loop.
+    """
+
+    def __init__(self, path=DEFAULT_INTENTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.load()
+
+    def init_app(self, app):
+        self.path = app.config.get('CHAT_INTENTS_FILE') or DEFAULT_INTENTS_FILE
+        self.load()
+
+    def load(self):
+        """(Re)compile the intents file and reset the hit counters."""
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        intents, alternatives = [], []
+        for index, item in enumerate(data['intents']):
+            pattern = '|'.join(f'(?:{p})' for p in item['patterns'])
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern in chat intent '{item['name']}': {e}")
+            if compiled.groupindex:
+                raise ValueError(f"Chat intent '{item['name']}' uses named groups; the engine reserves them")
+            intents.append(Intent(item['name'], item['response'], item.get('escalate', False), item.get('catalog')))
+            alternatives.append(f'(?P<i{index}>{pattern})')
+
+        fallback = data['fallback']
+        scanner = re.compile('(?=' + '|'.join(alternatives) + ')') if alternatives else None
+        # Swapped as a whole; hits[-1] counts fallback answers
+        self._compiled = (tuple(intents), Intent('fallback', fallback['response'], fallback.get('escalate', True), None),
+                          scanner, [0] * (len(intents) + 1))
+
+    def match(self, message):
+        """Return the Intent answering `message` (the fallback when none matches)."""
+        intents, fallback, scanner, hits = self._compiled
+        best = None
+        if scanner is not None:
+            for m in scanner.finditer(message.lower()):
+                index = int(m.lastgroup[1:])
+                if best is None or index < best:
+                    best = index
+                    if index == 0:
+                        break
+
+        with self._lock:
+            hits[-1 if best is None else best] += 1
+        return fallback if best is None else intents[best]
+
+    def stats(self):
+        """Per-intent hit counters for this process, in file order."""
+        intents, _, _, hits = self._compiled
+        with self._lock:
+            return {
+                "intents": [{"name": intent.name, "hits": count} for intent, count in zip(intents, hits)],
+                "fallback": hits[-1]
+            }
+
+intent_engine = IntentEngine()
@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from models import db, User
+
+# Columns kept in the identity snapshot. Everything else (password hash,
+# notification stamps) is left unloaded and read from the database only when
+# a view actually touches it.
+IDENTITY_COLUMNS = (
+    'id', 'username', 'email', 'full_name', 'referred_by', 'discount', 'mobile_number',
+    'role', 'status', 'profile_image', 'referral_code', 'created_on'
+)
+
+# ---------- VERSION BACKENDS ----------
+class LocalIdentityBackend:
+    """In-process per-user version counters.
+
+    Fine for a single worker and for tests. With several workers each one
+    relies on the cache TTL to see changes made through other workers.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get_version(self, user_id):
+        return self._versions.get(user_id, 0)
+
+    def bump_versions(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+class RedisIdentityBackend:
+    """Per-user version counters shared by every worker through a Redis hash."""
+
+    def __init__(self, url, key='vidyasetu:identity:versions'):
+        import redis  # optional dependency, only needed when IDENTITY_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+        self._key = key
+
+    def get_version(self, user_id):
+        return int(self._client.hget(self._key, user_id) or 0)
+
+    def bump_versions(self, user_ids):
+        pipe = self._client.pipeline()
+        for user_id in user_ids:
+            pipe.hincrby(self._key, user_id, 1)
+        pipe.execute()
+
+# ---------- IDENTITY CACHE ----------
+class IdentityCache:
+    """Process-wide LRU of user identity snapshots for the login manager.
+
+    An entry is reused while it is younger than `ttl` and its version matches
+    the backend's. Committing a change to any snapshot column (status, role,
+    profile fields) or deleting the user bumps that user's version, so the
+    next request reloads it.
+    """
+
+    def __init__(self, backend=None, ttl=60, max_entries=10000):
+        self.backend = backend or LocalIdentityBackend()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (version, loaded_at, values)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        redis_url = app.config.get('IDENTITY_REDIS_URL')
+        if redis_url:
+            self.backend = RedisIdentityBackend(redis_url)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('IDENTITY_CACHE_SIZE', self.max_entries)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def _cached(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                return entry[2]
+        return None
+
+    def _store(self, user_id, version, values):
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic(), values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, user_id):
+        """Return the User for `user_id` attached to the current session, or None.
+
+        On a cache hit no query is issued: the snapshot becomes a persistent
+        instance through merge(load=False), and columns outside the snapshot
+        load lazily on first access.
+        """
+        # Read the version before the row so a concurrent bump is never lost
+        version = self.backend.get_version(user_id)
+        values = self._cached(user_id, version)
+        if values is None:
+            row = db.session.query(*[getattr(User, name) for name in IDENTITY_COLUMNS]).filter(User.id == user_id).first()
+            if row is None:
+                return None
+            values = dict(zip(IDENTITY_COLUMNS, row))
+            self._store(user_id, version, values)
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_ids):
+        """Bump the versions of `user_ids`; call after the change is committed."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        self.backend.bump_versions(user_ids)
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+identity_cache = IdentityCache()
+
+# ---------- INVALIDATION ----------
+@event.listens_for(Session, "after_flush")
+def _collect_changed_identities(session, flush_context):
+    """Remember users whose snapshot columns changed in this flush."""
+    changed = set()
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in IDENTITY_COLUMNS):
+                changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    if changed:
+        session.info.setdefault('changed_identities', set()).update(changed)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_identities(session):
+    changed = session.info.pop('changed_identities', None)
+    if changed:
+        identity_cache.invalidate(changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_identities(session):
+    session.info.pop('changed_identities', None)
@@ -0,0 +1,91 @@
+import ast
+import os
+import sys
+import click
+from models import db
+
+# Sources whose queries must be backed by an index
+AUDITED_PATHS = ('app.py', 'blueprints', 'services')
+
+# ---------- QUERY SHAPES ----------
+def _model_name(node):
+    """Walk a query receiver down to the model it queries, e.g. `Enrollment.query...`."""
+    while True:
+        if isinstance(node, ast.Attribute):
+            if node.attr == 'query' and isinstance(node.value, ast.Name):
+                return node.value.id
+            node = node.value
+        elif isinstance(node, ast.Call):
+            func = node.func
+            # db.session.query(Model.column) / db.session.query(Model)
+            if isinstance(func, ast.Attribute) and func.attr == 'query' and node.args:
+                first = node.args[0]
+                if isinstance(first, ast.Attribute) and isinstance(first.value, ast.Name):
+                    return first.value.id
+                if isinstance(first, ast.Name):
+                    return first.id
+            node = func
+        else:
+            return None
+
+def _source_files(root):
+    for path in AUDITED_PATHS:
+        full = os.path.join(root, path)
+        if os.path.isfile(full):
+            yield full
+        elif os.path.isdir(full):
+            for dirpath, _, filenames in os.walk(full):
+                for filename in sorted(filenames):
+                    if filename.endswith('.py'):
+                        yield os.path.join(dirpath, filename)
+
+def find_filter_by_patterns(root):
+    """Yield (file, line, model name, column tuple) for every filter_by() call."""
+    for filename in _source_files(root):
+        with open(filename, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=filename)
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'filter_by'):
+                continue
+            columns = tuple(sorted(kw.arg for kw in node.keywords if kw.arg))
+            model = _model_name(node.func.value)
+            if model and columns:
+                yield os.path.relpath(filename, root), node.lineno, model, columns
+
+# ---------- COVERAGE ----------
+def _tables_by_model():
+    return {mapper.class_.__name__: mapper.local_table for mapper in db.Model.registry.mappers}
+
+def is_covered(table, columns):
+    """True if an equality filter on `columns` can be answered from an index.
+
+    Primary keys and unique columns always qualify; otherwise some index or
+    unique constraint must start with exactly these columns (in any order).
+    """
+    wanted = set(columns)
+    if any(table.c[name].primary_key or table.c[name].unique for name in wanted if name in table.c):
+        return True
+    unique_constraints = [c for c in table.constraints if isinstance(c, db.UniqueConstraint)]
+    for index in list(table.indexes) + unique_constraints:
+        leading = [column.name for column in index.columns][:len(wanted)]
+        if set(leading) == wanted:
+            return True
+    return False
+
+def uncovered_patterns(root):
+    tables = _tables_by_model()
+    for filename, lineno, model, columns in find_filter_by_patterns(root):
+        table = tables.get(model)
+        if table is not None and not is_covered(table, columns):
+            yield filename, lineno, model, columns
+
+@click.command('check-indexes')
+def check_indexes_command():
+    """Fail if a filter_by() pattern is not covered by any index."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    missing = list(uncovered_patterns(root))
+    for filename, lineno, model, columns in missing:
+        click.echo(f"{filename}:{lineno}: {model}.filter_by({', '.join(columns)}) has no covering index")
+    if missing:
+        sys.exit(1)
+    click.echo("All filter_by() patterns are covered by an index.")
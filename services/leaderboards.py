@@ -0,0 +1,217 @@
+import bisect
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+import click
+from flask import current_app, request
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, BootstrapMarker, GameScore, LeaderboardEntry
+
+GAME_CATEGORIES = ('code-quiz', 'speed-typing', 'cyber-security', 'data-science', 'web-dev', 'ai-ml')
+PERIODS = ('daily', 'weekly', 'all_time')
+TOP_K = 10
+ALL_TIME_START = date(1970, 1, 1)
+
+ScoreEntry = namedtuple('ScoreEntry', ['user_name', 'score', 'created_at'])
+
+def period_start(period, moment):
+    """First day (UTC) of the period containing `moment`."""
+    day = moment.date()
+    if period == 'daily':
+        return day
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    return ALL_TIME_START
+
+def _rank_key(entry):
+    # Higher score first; on ties the earlier score keeps its place
+    return (-entry.score, entry.created_at)
+
+# ---------- ENGINE ----------
+class LeaderboardEngine:
+    """In-memory top-K boards for the current periods, backed by leaderboard_entry.
+
+    Boards are reloaded with one query once `ttl` seconds old, so scores saved
+    by other workers show up within that time; scores saved by this worker are
+    applied as soon as their transaction commits. The JSON snapshot and its
+    ETag are rebuilt only after a board changes.
+    """
+
+    def __init__(self, top_k=TOP_K, ttl=10):
+        self.top_k = top_k
+        self.ttl = ttl
+        self._boards = None  # {(period, period_start, category): [ScoreEntry, ...]}
+        self._loaded_at = 0
+        self._snapshot = None  # (etag, body)
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('LEADERBOARD_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._boards = None
+            self._snapshot = None
+
+    def _load(self):
+        now = datetime.utcnow()
+        current = db.or_(*[
+            db.and_(LeaderboardEntry.period == period, LeaderboardEntry.period_start == period_start(period, now))
+            for period in PERIODS
+        ])
+        rows = db.session.query(
+            LeaderboardEntry.period, LeaderboardEntry.period_start, LeaderboardEntry.game_category,
+            LeaderboardEntry.user_name, LeaderboardEntry.score, LeaderboardEntry.created_at
+        ).filter(current).all()
+        boards = {}
+        for row in rows:
+            key = (row.period, row.period_start, row.game_category)
+            boards.setdefault(key, []).append(ScoreEntry(row.user_name, row.score, row.created_at))
+        for entries in boards.values():
+            entries.sort(key=_rank_key)
+            del entries[self.top_k:]
+        self._boards = boards
+        self._loaded_at = time.monotonic()
+        self._snapshot = None
+        return boards
+
+    def _current_boards(self):
+        if self._boards is None or time.monotonic() - self._loaded_at >= self.ttl:
+            return self._load()
+        return self._boards
+
+    def qualifies(self, key, entry):
+        """True when `entry` would make the board; stale boards only err towards True."""
+        with self._lock:
+            entries = self._current_boards().get(key, [])
+            return len(entries) < self.top_k or _rank_key(entry) < _rank_key(entries[-1])
+
+    def apply(self, key, entry):
+        """Insert a committed entry into the in-memory board."""
+        with self._lock:
+            if self._boards is None:
+                return
+            entries = self._boards.setdefault(key, [])
+            keys = [_rank_key(e) for e in entries]
+            entries.insert(bisect.bisect_right(keys, _rank_key(entry)), entry)
+            del entries[self.top_k:]
+            self._snapshot = None
+
+    def snapshot(self):
+        """Return (etag, JSON body) covering every category and period."""
+        with self._lock:
+            boards = self._current_boards()
+            if self._snapshot is None:
+                now = datetime.utcnow()
+                periods = {
+                    period: {
+                        category: [{
+                            'user_name': e.user_name,
+                            'score': e.score,
+                            'created_at': e.created_at.isoformat()
+                        } for e in boards.get((period, period_start(period, now), category), [])]
+                        for category in GAME_CATEGORIES
+                    }
+                    for period in PERIODS
+                }
+                body = json.dumps({"leaderboard": periods['all_time'], "periods": periods}, sort_keys=True)
+                self._snapshot = (hashlib.sha1(body.encode('utf-8')).hexdigest(), body)
+            return self._snapshot
+
+leaderboard_engine = LeaderboardEngine()
+
+# ---------- WRITING ----------
+def _trim(key):
+    """Delete rows that fell off the board, and the board's expired periods."""
+    period, start, category = key
+    board = db.and_(LeaderboardEntry.period == period, LeaderboardEntry.game_category == category)
+    kept = db.select(LeaderboardEntry.id).where(board, LeaderboardEntry.period_start == start).order_by(
+        LeaderboardEntry.score.desc(), LeaderboardEntry.created_at
+    ).limit(leaderboard_engine.top_k)
+    db.session.execute(db.delete(LeaderboardEntry).where(
+        board, LeaderboardEntry.period_start == start, LeaderboardEntry.id.not_in(kept)
+    ))
+    if period != 'all_time':
+        db.session.execute(db.delete(LeaderboardEntry).where(board, LeaderboardEntry.period_start < start))
+
+def record_score(category, user_name, score, created_at):
+    """Add a score to each period board it makes. The caller commits.
+
+    Scores below the current K-th entry cost no writes at all.
+    """
+    entry = ScoreEntry(user_name, score, created_at)
+    added = []
+    for period in PERIODS:
+        key = (period, period_start(period, created_at), category)
+        if not leaderboard_engine.qualifies(key, entry):
+            continue
+        db.session.add(LeaderboardEntry(
+            game_category=category, period=period, period_start=key[1],
+            user_name=user_name, score=score, created_at=created_at
+        ))
+        added.append((key, entry))
+    if added:
+        db.session.flush()
+        for key, _ in added:
+            _trim(key)
+        db.session.info.setdefault('pending_leaderboard_entries', []).extend(added)
+    return len(added)
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_entries(session):
+    for key, entry in session.info.pop('pending_leaderboard_entries', ()):
+        leaderboard_engine.apply(key, entry)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_entries(session):
+    session.info.pop('pending_leaderboard_entries', None)
+
+def rebuild_leaderboards():
+    """Recompute every current board from GameScore."""
+    now = datetime.utcnow()
+    db.session.query(LeaderboardEntry).delete()
+    for period in PERIODS:
+        start = period_start(period, now)
+        for category in GAME_CATEGORIES:
+            query = GameScore.query.filter(GameScore.game_type == category)
+            if period != 'all_time':
+                query = query.filter(GameScore.created_at >= datetime.combine(start, datetime.min.time()))
+            top = query.order_by(GameScore.score.desc(), GameScore.created_at).limit(leaderboard_engine.top_k)
+            for score in top:
+                db.session.add(LeaderboardEntry(
+                    game_category=category, period=period, period_start=start,
+                    user_name=score.name, score=score.score, created_at=score.created_at
+                ))
+    db.session.commit()
+    leaderboard_engine.clear()
+
+def bootstrap_leaderboards():
+    """Seed the boards from the score history once, on the first deploy that has them."""
+    if db.session.get(BootstrapMarker, 'leaderboards'):
+        return False
+    rebuild_leaderboards()
+    db.session.add(BootstrapMarker(name='leaderboards', version=1, applied_on=datetime.utcnow()))
+    db.session.commit()
+    return True
+
+# ---------- SERVING ----------
+def leaderboard_response():
+    """The whole leaderboard from the cached snapshot; 304 when the ETag matches."""
+    etag, body = leaderboard_engine.snapshot()
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@click.command('rebuild-leaderboards')
+@with_appcontext
+def rebuild_leaderboards_command():
+    """Recompute the leaderboard boards from the game_score table."""
+    rebuild_leaderboards()
+    click.echo("Leaderboards rebuilt.")
@@ -0,0 +1,24 @@
+from models import db, Course, Enrollment, Payment
+
+# ---------- DUES ----------
+def calculate_enrollment_dues(*criteria):
+    """Return {enrollment_id: due} for active enrollments with an outstanding balance.
+
+    Paid amounts are summed per enrollment in a single grouped query joined to
+    Course.fee, so the cost does not grow with one round-trip per enrollment.
+    Extra criteria (e.g. Enrollment.user_id == some_id) narrow the enrollments.
+    """
+    total_paid = db.func.coalesce(db.func.sum(Payment.amount), 0)
+    due = Course.fee - total_paid
+
+    rows = db.session.query(Enrollment.id, due).join(
+        Course, Course.id == Enrollment.course_id
+    ).outerjoin(
+        Payment, db.and_(Payment.enrollment_id == Enrollment.id, Payment.status == 'completed')
+    ).filter(
+        Enrollment.status == 'active', *criteria
+    ).group_by(
+        Enrollment.id, Course.fee
+    ).having(due > 0).all()
+
+    return {enrollment_id: amount for enrollment_id, amount in rows}
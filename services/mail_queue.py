@@ -0,0 +1,144 @@
+import smtplib
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_mail import Message
+from models import db, OutboundEmail
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# A 'sending' row whose lease expired (worker died mid-batch) is picked up again
+SEND_LEASE_SECONDS = 300
+
+# ---------- ENQUEUE ----------
+def queue_enabled():
+    return current_app.config.get('MAIL_QUEUE', False)
+
+def enqueue_messages(messages):
+    """Persist Flask-Mail Messages to the outbox for the mail worker."""
+    db.session.execute(db.insert(OutboundEmail), [
+        {
+            "sender": msg.sender,
+            "recipients": ','.join(msg.recipients),
+            "subject": msg.subject,
+            "body": msg.body or ''
+        } for msg in messages
+    ])
+    db.session.commit()
+
+def dispatch(msg):
+    """Queue `msg` when MAIL_QUEUE is on, otherwise send it on a pooled connection."""
+    if queue_enabled():
+        enqueue_messages([msg])
+        return
+
+    from utils import get_mail_pool
+    sent, failed = get_mail_pool().send([msg])
+    if failed:
+        raise failed[0][1]
+
+# ---------- WORKER ----------
+def backoff_delay(attempts):
+    """Seconds to wait before retry number `attempts` (30s, 60s, 120s, ... capped at 1h)."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+
+def _due_filter(now):
+    return db.and_(OutboundEmail.status.in_(['pending', 'sending']), OutboundEmail.next_attempt_at <= now)
+
+def claim_batch(limit):
+    """Lease up to `limit` due emails to this worker and return them."""
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=SEND_LEASE_SECONDS)
+    candidates = db.session.query(OutboundEmail.id).filter(_due_filter(now)).order_by(
+        OutboundEmail.next_attempt_at
+    ).limit(limit).all()
+
+    claimed = []
+    for (email_id,) in candidates:
+        # Conditional update, so two workers never lease the same row
+        updated = OutboundEmail.query.filter(OutboundEmail.id == email_id, _due_filter(now)).update(
+            {'status': 'sending', 'next_attempt_at': lease_until}, synchronize_session=False
+        )
+        if updated:
+            claimed.append(email_id)
+    db.session.commit()
+
+    if not claimed:
+        return []
+    return OutboundEmail.query.filter(OutboundEmail.id.in_(claimed)).order_by(OutboundEmail.created_on).all()
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_delay(email.attempts))
+
+def deliver_batch(emails):
+    """Send leased emails over one pooled SMTP connection. Returns the number sent."""
+    from utils import SMTP_MESSAGE_ERRORS, get_mail_pool
+    pool = get_mail_pool()
+    sent = failed = 0
+    started = time.monotonic()
+    try:
+        with pool.connection() as connection:
+            for email in emails:
+                msg = Message(email.subject, sender=email.sender, recipients=email.recipients.split(','), body=email.body)
+                try:
+                    connection.send(msg)
+                except SMTP_MESSAGE_ERRORS as e:
+                    current_app.logger.warning(f"Outbound email {email.id} rejected: {e}")
+                    _record_failure(email, e)
+                    failed += 1
+                    continue
+                email.status = 'sent'
+                email.attempts += 1
+                email.sent_on = datetime.utcnow()
+                sent += 1
+    except (smtplib.SMTPException, OSError) as e:
+        # Connection-level failure: everything not yet sent is retried later
+        current_app.logger.error(f"SMTP connection failed: {e}")
+        for email in emails:
+            if email.status == 'sending':
+                _record_failure(email, e)
+                failed += 1
+    pool.metrics.record_batch(sent, failed, time.monotonic() - started)
+    db.session.commit()
+    return sent
+
+def drain_outbox(batch_size=50):
+    """Send every email that is due right now. Returns (sent, attempted)."""
+    sent = attempted = 0
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return sent, attempted
+        attempted += len(emails)
+        sent += deliver_batch(emails)
+
+@click.command('mail-worker')
+@click.option('--batch-size', default=50, show_default=True, help='Emails sent per SMTP connection.')
+@click.option('--poll-interval', default=5.0, show_default=True, help='Seconds to sleep when the outbox is empty.')
+@click.option('--once', is_flag=True, help='Drain the emails that are due now and exit.')
+@with_appcontext
+def mail_worker_command(batch_size, poll_interval, once):
+    """Deliver queued outbound emails.
+
+    For local testing point MAIL_SERVER/MAIL_PORT at a debugging server, e.g.
+    `python -m aiosmtpd -n -l localhost:1025` with MAIL_USE_TLS=false.
+    """
+    click.echo("Mail worker started.")
+    while True:
+        sent, attempted = drain_outbox(batch_size)
+        if attempted:
+            from utils import get_mail_pool
+            click.echo(f"Sent {sent} of {attempted} email(s). {get_mail_pool().metrics.snapshot()}")
+        if once:
+            break
+        db.session.remove()
+        time.sleep(poll_interval)
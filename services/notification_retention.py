@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from models import db, User, Notification, NotificationReceipt, NotificationArchive
+from services.notifications import AUDIENCES
+
+DEFAULT_BATCH_SIZE = 1000
+
+# ---------- SELECTION ----------
+def _archivable(cutoff):
+    """Read notifications older than `cutoff`.
+
+    A direct row qualifies once its reader has read it; a broadcast row once
+    every current member of its audience has read (or dismissed) it.
+    """
+    conditions = [db.and_(Notification.user_id.isnot(None), Notification.is_read == True)]
+    for audience, roles in AUDIENCES.items():
+        unread_reader = db.select(User.id).where(
+            User.role.in_(roles),
+            ~db.exists().where(
+                NotificationReceipt.notification_id == Notification.id,
+                NotificationReceipt.user_id == User.id,
+                NotificationReceipt.is_read == True
+            ).correlate_except(NotificationReceipt)
+        )
+        conditions.append(db.and_(Notification.audience == audience, ~db.exists(unread_reader)))
+    return db.and_(Notification.timestamp < cutoff, db.or_(*conditions))
+
+def count_archivable(cutoff):
+    return db.session.query(db.func.count(Notification.id)).filter(_archivable(cutoff)).scalar()
+
+def _record(row):
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "audience": row.audience,
+        "message": row.message,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None
+    }
+
+# ---------- ARCHIVING ----------
+def archive_notifications(cutoff, batch_size=DEFAULT_BATCH_SIZE, archive_file=None):
+    """Move archivable notifications to the archive, one bounded batch per transaction.
+
+    Rows go to the notification_archive table, or are appended to the gzip
+    JSONL `archive_file`. The file is flushed before each batch is deleted, so
+    an interrupted run can at worst archive a batch twice, never lose it.
+    Returns {"rows", "batches", "bytes", "archive_bytes"}; `bytes` is the size
+    of the removed rows serialized as JSON, an estimate of what was reclaimed.
+    """
+    result = {"rows": 0, "batches": 0, "bytes": 0, "archive_bytes": 0}
+    archive_size = os.path.getsize(archive_file) if archive_file and os.path.exists(archive_file) else 0
+    out = gzip.open(archive_file, 'at', encoding='utf-8') if archive_file else None
+    try:
+        while True:
+            rows = db.session.query(
+                Notification.id, Notification.user_id, Notification.audience, Notification.message, Notification.timestamp
+            ).filter(_archivable(cutoff)).order_by(Notification.timestamp).limit(batch_size).all()
+            if not rows:
+                break
+
+            lines = [json.dumps(_record(row), separators=(',', ':')) for row in rows]
+            if out:
+                out.write("\n".join(lines) + "\n")
+                out.flush()
+            else:
+                now = datetime.utcnow()
+                db.session.execute(db.insert(NotificationArchive), [
+                    {"id": row.id, "user_id": row.user_id, "audience": row.audience,
+                     "message": row.message, "timestamp": row.timestamp, "archived_on": now}
+                    for row in rows
+                ])
+
+            ids = [row.id for row in rows]
+            db.session.execute(db.delete(NotificationReceipt).where(NotificationReceipt.notification_id.in_(ids)))
+            db.session.execute(db.delete(Notification).where(Notification.id.in_(ids)))
+            db.session.commit()
+
+            result["rows"] += len(rows)
+            result["batches"] += 1
+            result["bytes"] += sum(len(line.encode('utf-8')) for line in lines)
+            if len(rows) < batch_size:
+                break
+    finally:
+        if out:
+            out.close()
+    if archive_file:
+        result["archive_bytes"] = os.path.getsize(archive_file) - archive_size
+    return result
+
+@click.command('archive-notifications')
+@click.option('--older-than-days', type=int, default=None,
+              help='Only archive notifications older than this. [default: NOTIFICATION_RETENTION_DAYS]')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows archived and deleted per transaction.')
+@click.option('--archive-file', type=click.Path(dir_okay=False), default=None,
+              help='Append to this gzip JSONL file instead of the notification_archive table.')
+@click.option('--dry-run', is_flag=True, help='Only report how many notifications would be archived.')
+@with_appcontext
+def archive_notifications_command(older_than_days, batch_size, archive_file, dry_run):
+    """Archive read notifications and delete them from the notification table."""
+    if older_than_days is None:
+        older_than_days = current_app.config.get('NOTIFICATION_RETENTION_DAYS', 90)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    if dry_run:
+        click.echo(f"{count_archivable(cutoff)} read notification(s) older than {older_than_days} day(s) would be archived.")
+        return
+
+    started = time.perf_counter()
+    result = archive_notifications(cutoff, batch_size, archive_file)
+    elapsed = time.perf_counter() - started
+    target = archive_file or 'notification_archive'
+    click.echo(
+        f"Archived {result['rows']} notification(s) to {target} in {result['batches']} batch(es) "
+        f"({elapsed:.2f}s); reclaimed ~{result['bytes']} bytes of notification data."
+    )
+    if archive_file:
+        click.echo(f"Archive file grew by {result['archive_bytes']} bytes.")
@@ -0,0 +1,188 @@
+import json
+import queue
+import threading
+import time
+from flask import Response, jsonify
+
+# Sent as the SSE `retry:` field so EventSource reconnects quickly after a drop
+RECONNECT_MILLISECONDS = 3000
+
+# Events buffered per subscriber before new ones are dropped for it
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# ---------- BROKERS ----------
+class LocalSubscription:
+    def __init__(self, broker, channels):
+        self._broker = broker
+        self.channels = tuple(channels)
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout):
+        """Return the next event payload, or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker._unsubscribe(self)
+
+class LocalBroker:
+    """In-process pub/sub.
+
+    Only reaches subscribers connected to the same worker process; use the
+    Redis broker when the app runs more than one worker.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(payload)
+            except queue.Full:
+                pass  # A stalled client catches up with a poll when it reconnects
+
+    def subscribe(self, channels):
+        subscription = LocalSubscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def get(self, timeout):
+        message = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not message:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self._pubsub.close()
+
+class RedisBroker:
+    """Pub/sub shared by every worker through Redis channels."""
+
+    def __init__(self, url, prefix='vidyasetu:notifications:'):
+        import redis  # optional dependency, only needed when NOTIFICATION_BROKER_URL is set
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def publish(self, channel, payload):
+        self._client.publish(self._prefix + channel, json.dumps(payload))
+
+    def subscribe(self, channels):
+        pubsub = self._client.pubsub()
+        pubsub.subscribe(*[self._prefix + channel for channel in channels])
+        return RedisSubscription(pubsub)
+
+# ---------- STREAM ----------
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+def audience_channel(audience):
+    return f"audience:{audience}"
+
+def _format_event(payload):
+    return f"event: notification\nid: {payload['id']}\ndata: {json.dumps(payload)}\n\n"
+
+class NotificationStream:
+    """Publishes committed notifications to the dashboards streaming them.
+
+    Each open stream holds a worker thread, so streaming is off unless
+    NOTIFICATION_STREAMS is set, and at most `max_open` streams run per
+    process. Requests beyond that get a 503 and the dashboard keeps polling.
+    """
+
+    def __init__(self, broker=None, keepalive=15, max_age=300, enabled=False, max_open=4):
+        self.broker = broker or LocalBroker()
+        self.keepalive = keepalive
+        self.max_age = max_age
+        self.enabled = enabled
+        self.max_open = max_open
+        self._open = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        broker_url = app.config.get('NOTIFICATION_BROKER_URL')
+        self.broker = RedisBroker(broker_url) if broker_url else LocalBroker()
+        self.keepalive = app.config.get('NOTIFICATION_STREAM_KEEPALIVE', self.keepalive)
+        self.max_age = app.config.get('NOTIFICATION_STREAM_MAX_AGE', self.max_age)
+        self.enabled = app.config.get('NOTIFICATION_STREAMS', self.enabled)
+        self.max_open = app.config.get('NOTIFICATION_STREAM_MAX_OPEN', self.max_open)
+
+    def _reserve(self):
+        with self._lock:
+            if not self.enabled or self._open >= self.max_open:
+                return False
+            self._open += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._open -= 1
+
+    def publish(self, payloads):
+        """Deliver (channel, payload) pairs; payloads must be JSON-serializable."""
+        for channel, payload in payloads:
+            self.broker.publish(channel, payload)
+
+    def response(self, channels):
+        """Return a text/event-stream response for `channels`.
+
+        The generator runs without the request context or a database session,
+        so an open stream costs a worker thread and nothing else. Streams end
+        after `max_age` seconds and EventSource reconnects on its own. When
+        streaming is off or `max_open` streams are already running, the
+        response is a 503, which EventSource does not retry.
+        """
+        if not self._reserve():
+            response = jsonify({"success": False, "message": "Notification stream unavailable, use polling."})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(self.max_age)
+            return response
+
+        subscription = self.broker.subscribe(channels)
+        keepalive, max_age = self.keepalive, self.max_age
+        closed = []
+
+        def close():
+            # Runs when the server closes the response, even if the generator never started
+            if not closed:
+                closed.append(True)
+                subscription.close()
+                self._release()
+
+        def generate():
+            try:
+                yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+                deadline = time.monotonic() + max_age
+                while time.monotonic() < deadline:
+                    payload = subscription.get(timeout=keepalive)
+                    yield _format_event(payload) if payload is not None else ": keepalive\n\n"
+            finally:
+                close()
+
+        response = Response(generate(), mimetype='text/event-stream')
+        response.call_on_close(close)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+notification_stream = NotificationStream()
@@ -0,0 +1,288 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import current_app, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, User, Enrollment, Notification, NotificationReceipt
+from services.notification_stream import audience_channel, notification_stream, user_channel
+
+ADMIN_ROLES = ('admin', 'main_admin')
+
+# Broadcast audience -> roles that read it
+AUDIENCES = {
+    'admins': ADMIN_ROLES,
+}
+
+# What the views render/serialize; is_read is resolved per reader for broadcasts
+NotificationView = namedtuple('NotificationView', ['id', 'message', 'timestamp', 'is_read'])
+
+# Re-read this much before a poll cursor so rows committed by a transaction
+# that started before the previous poll are not missed
+POLL_OVERLAP_SECONDS = 5
+
+# ---------- VERSION STAMPS ----------
+def _bump_versions(connection, user_ids=(), roles=()):
+    """Increment notification_version for the given users and/or roles."""
+    user_table = User.__table__
+    conditions = []
+    if user_ids:
+        conditions.append(user_table.c.id.in_(user_ids))
+    if roles:
+        conditions.append(user_table.c.role.in_(roles))
+    if conditions:
+        connection.execute(
+            user_table.update()
+            .where(db.or_(*conditions))
+            .values(notification_version=user_table.c.notification_version + 1)
+        )
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_versions(session, flush_context):
+    """Bump the version stamp of everyone whose notifications this flush touched
+    and queue new rows for the push stream.
+
+    Bulk inserts/updates/deletes bypass the unit of work; the helpers below that
+    use them bump the stamps themselves.
+    """
+    user_ids, roles = set(), set()
+    _queue_push(session, [
+        {"id": obj.id, "user_id": obj.user_id, "audience": obj.audience, "message": obj.message, "timestamp": obj.timestamp}
+        for obj in session.new if isinstance(obj, Notification)
+    ])
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Notification):
+            if obj.user_id:
+                user_ids.add(obj.user_id)
+            if obj.audience in AUDIENCES:
+                roles.update(AUDIENCES[obj.audience])
+        elif isinstance(obj, NotificationReceipt):
+            user_ids.add(obj.user_id)
+    if user_ids or roles:
+        _bump_versions(session.connection(), user_ids, roles)
+
+# ---------- PUSH ----------
+def _queue_push(session, rows):
+    """Hold new notification rows (dicts) on the session until its transaction commits."""
+    if not rows:
+        return
+    pending = session.info.setdefault('pending_notification_pushes', [])
+    for row in rows:
+        payload = {
+            'id': row['id'],
+            'message': row['message'],
+            'timestamp': row['timestamp'].isoformat(),
+            'is_read': False
+        }
+        channel = user_channel(row['user_id']) if row.get('user_id') else audience_channel(row['audience'])
+        pending.append((channel, payload))
+
+@event.listens_for(Session, "after_commit")
+def _publish_pushes(session):
+    pending = session.info.pop('pending_notification_pushes', None)
+    if pending:
+        notification_stream.publish(pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pushes(session):
+    session.info.pop('pending_notification_pushes', None)
+
+def stream_notifications_response(user):
+    """Server-sent events carrying the user's new direct and broadcast notifications."""
+    channels = [user_channel(user.id)] + [audience_channel(audience) for audience in audiences_for(user)]
+    # Give the pooled connection back; the stream itself never queries
+    db.session.close()
+    return notification_stream.response(channels)
+
+def notification_stamp(user):
+    """Return (version, cleared_on) for `user` with one primary-key lookup."""
+    return db.session.query(User.notification_version, User.notifications_cleared_on).filter(User.id == user.id).one()
+
+# ---------- WRITING ----------
+def fan_out(recipient_ids, message):
+    """Create one Notification per recipient with a single executemany INSERT.
+
+    `recipient_ids` is a select() of user ids; no ORM objects are built, so
+    notifying thousands of users costs one SELECT and one batched INSERT.
+    The caller commits. Returns the number of rows written.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"id": str(uuid.uuid4()), "user_id": user_id, "message": message, "is_read": False, "timestamp": now}
+        for (user_id,) in db.session.execute(recipient_ids)
+    ]
+    if rows:
+        db.session.execute(db.insert(Notification), rows)
+        _bump_versions(db.session.connection(), {row["user_id"] for row in rows})
+        _queue_push(db.session, rows)
+    return len(rows)
+
+def broadcast(audience, message):
+    """Store `message` once for every reader in `audience`. The caller commits."""
+    if audience not in AUDIENCES:
+        raise ValueError(f"Unknown notification audience '{audience}'")
+    notification = Notification(audience=audience, message=message)
+    db.session.add(notification)
+    return notification
+
+def notify_admins(message):
+    """Notify every admin, as one broadcast row when NOTIFICATION_BROADCASTS is on."""
+    if current_app.config.get('NOTIFICATION_BROADCASTS'):
+        broadcast('admins', message)
+        return 1
+    return fan_out(db.select(User.id).where(User.role.in_(ADMIN_ROLES)), message)
+
+def notify_course_students(course_id, message):
+    """Notify every student with an active enrollment in the course."""
+    recipients = db.select(Enrollment.user_id).where(
+        Enrollment.course_id == course_id, Enrollment.status == 'active'
+    ).distinct()
+    return fan_out(recipients, message)
+
+# ---------- READING ----------
+def audiences_for(user):
+    return [name for name, roles in AUDIENCES.items() if user.role in roles]
+
+def _notifications_query(user):
+    """Return (query, is_read, updated_on) over the user's direct and broadcast notifications."""
+    audiences = audiences_for(user)
+    if not audiences:
+        query = db.session.query(Notification.id, Notification.message, Notification.timestamp, Notification.is_read).filter(
+            Notification.user_id == user.id
+        )
+        return query, Notification.is_read, Notification.updated_on
+
+    is_read = db.case(
+        (Notification.audience.is_(None), Notification.is_read),
+        else_=db.func.coalesce(NotificationReceipt.is_read, False)
+    )
+    updated_on = db.case(
+        (NotificationReceipt.updated_on > Notification.updated_on, NotificationReceipt.updated_on),
+        else_=Notification.updated_on
+    )
+    query = db.session.query(Notification.id, Notification.message, Notification.timestamp, is_read).outerjoin(
+        NotificationReceipt,
+        db.and_(NotificationReceipt.notification_id == Notification.id, NotificationReceipt.user_id == user.id)
+    ).filter(
+        db.or_(
+            Notification.user_id == user.id,
+            db.and_(
+                Notification.audience.in_(audiences),
+                db.func.coalesce(NotificationReceipt.dismissed, False) == False
+            )
+        )
+    )
+    return query, is_read, updated_on
+
+def user_notifications(user, unread_only=False):
+    """Return the user's direct and broadcast notifications, newest first."""
+    query, is_read, _ = _notifications_query(user)
+    if unread_only:
+        query = query.filter(is_read == False)
+    return [NotificationView(*row) for row in query.order_by(Notification.timestamp.desc())]
+
+def notification_changes(user, since=None):
+    """Notifications created or changed after `since` (all of them when None) plus the unread count."""
+    query, is_read, updated_on = _notifications_query(user)
+    unread_count = query.filter(is_read == False).count()
+    if since is not None:
+        query = query.filter(updated_on > since - timedelta(seconds=POLL_OVERLAP_SECONDS))
+    rows = [NotificationView(*row) for row in query.order_by(Notification.timestamp.desc())]
+    return rows, unread_count
+
+def _encode_poll_cursor(version, polled_on):
+    return f"{version}:{polled_on.isoformat()}"
+
+def _decode_poll_cursor(cursor):
+    """Return (version, polled_on), or (None, None) for a missing or malformed cursor."""
+    try:
+        version, polled_on = cursor.split(':', 1)
+        return int(version), datetime.fromisoformat(polled_on)
+    except (AttributeError, ValueError):
+        return None, None
+
+def poll_notifications_response(user):
+    """JSON delta response for notification polling.
+
+    Clients pass back the `cursor` of their last poll as `?since=`. When the
+    user's version stamp has not moved the answer is a bodiless 304 and the
+    notification tables are never queried. Otherwise only rows changed since
+    the cursor are returned; `reset` tells the client to drop its copy and
+    use `notifications` as the full list.
+    """
+    version, cleared_on = notification_stamp(user)
+    etag = f"n{version}"
+    since_version, since = _decode_poll_cursor(request.args.get('since'))
+    if since_version == version or etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    polled_on = datetime.utcnow()
+    reset = since is None or (cleared_on is not None and cleared_on >= since)
+    rows, unread_count = notification_changes(user, None if reset else since)
+    response = jsonify({
+        "success": True,
+        "version": version,
+        "cursor": _encode_poll_cursor(version, polled_on),
+        "reset": reset,
+        "unread_count": unread_count,
+        "notifications": [{
+            'id': n.id,
+            'message': n.message,
+            'timestamp': n.timestamp.isoformat(),
+            'is_read': bool(n.is_read)
+        } for n in rows]
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _receipt(notification_id, user_id):
+    receipt = NotificationReceipt.query.filter_by(notification_id=notification_id, user_id=user_id).first()
+    if not receipt:
+        receipt = NotificationReceipt(notification_id=notification_id, user_id=user_id)
+        db.session.add(receipt)
+    return receipt
+
+def mark_read(user, notification_id):
+    """Mark one direct or broadcast notification read for `user`. The caller commits."""
+    notification = db.session.get(Notification, notification_id)
+    if not notification:
+        return False
+    if notification.user_id == user.id:
+        notification.is_read = True
+        return True
+    if notification.audience in audiences_for(user):
+        _receipt(notification.id, user.id).is_read = True
+        return True
+    return False
+
+def mark_all_read(user):
+    """Mark every direct notification of `user` read. The caller commits."""
+    Notification.query.filter_by(user_id=user.id).update({'is_read': True})
+    _bump_versions(db.session.connection(), {user.id})
+
+def dismiss_all(user):
+    """Delete the user's direct notifications and hide broadcasts from them. The caller commits."""
+    Notification.query.filter_by(user_id=user.id).delete()
+    db.session.query(User).filter(User.id == user.id).update({
+        'notifications_cleared_on': datetime.utcnow(),
+        'notification_version': User.notification_version + 1
+    }, synchronize_session=False)
+    audiences = audiences_for(user)
+    if not audiences:
+        return
+
+    NotificationReceipt.query.filter_by(user_id=user.id).update({'dismissed': True, 'is_read': True})
+    unreceipted = db.session.query(Notification.id).outerjoin(
+        NotificationReceipt,
+        db.and_(NotificationReceipt.notification_id == Notification.id, NotificationReceipt.user_id == user.id)
+    ).filter(Notification.audience.in_(audiences), NotificationReceipt.id.is_(None))
+    rows = [
+        {"id": str(uuid.uuid4()), "notification_id": notification_id, "user_id": user.id, "is_read": True, "dismissed": True}
+        for (notification_id,) in unreceipted
+    ]
+    if rows:
+        db.session.execute(db.insert(NotificationReceipt), rows)
@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidPageRequest(ValueError):
+    """Raised for an undecodable `after` cursor, one made for another
+    ordering, or an unsupported sort key."""
+
+# ---------- CURSORS ----------
+def encode_cursor(sort_key, descending, sort_value, row_id):
+    """Encode the ordering and the last row's (sort value, id) pair as an opaque URL-safe token."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_key, descending, sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort_column, descending=False):
+    """Decode a cursor back into a (sort value, id) pair typed for sort_column.
+
+    A cursor made for another sort column or direction is rejected rather
+    than compared against values of a different type.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, cursor_descending, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidPageRequest("Invalid cursor")
+    if sort_key != sort_column.key or cursor_descending != descending:
+        raise InvalidPageRequest("Cursor does not match the requested sort order")
+    return sort_value, row_id
+
+def parse_limit(value):
+    """Clamp a `limit` query argument to 1..MAX_PAGE_SIZE."""
+    try:
+        limit = int(value) if value else DEFAULT_PAGE_SIZE
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+# ---------- KEYSET PAGES ----------
+def keyset_page(query, sort_column, id_column, limit, after=None, descending=False):
+    """Fetch one page of `query` ordered by (sort_column, id_column).
+
+    The `after` cursor turns into a range predicate on the ordering columns, so
+    every page is an index range scan of `limit + 1` rows rather than an OFFSET
+    that re-reads everything before it. NULL sort values order below every
+    other value (first ascending, last descending) on every database, and the
+    predicate has explicit IS NULL branches so no row is skipped or repeated.
+    Returns (items, next_cursor).
+    """
+    if after:
+        sort_value, row_id = decode_cursor(after, sort_column, descending)
+        if sort_value is None:
+            # Inside the NULL group: its remaining rows, then (ascending) every non-NULL row
+            after_ids = id_column < row_id if descending else id_column > row_id
+            predicate = db.and_(sort_column.is_(None), after_ids)
+            if not descending:
+                predicate = db.or_(predicate, sort_column.isnot(None))
+        elif descending:
+            predicate = db.or_(
+                sort_column < sort_value,
+                db.and_(sort_column == sort_value, id_column < row_id),
+                sort_column.is_(None)
+            )
+        else:
+            predicate = db.or_(
+                sort_column > sort_value,
+                db.and_(sort_column == sort_value, id_column > row_id)
+            )
+        query = query.filter(predicate)
+
+    if descending:
+        query = query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc().nulls_first(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_column.key, descending, getattr(last, sort_column.key), getattr(last, id_column.key))
+    return items, next_cursor
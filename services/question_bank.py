@@ -0,0 +1,359 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from flask import current_app
+from models import db, Question, UserSeenQuestion
+from services.catalog import LocalCatalogBackend, RedisCatalogBackend
+
+DEFAULT_DRAW_SIZE = 10
+MAX_MARK_SEEN_BATCH = 500
+
+# ---------- VALIDATION ----------
+def validate_question(q):
+    """Check a generated/imported question dict; raises ValueError like generate_questions."""
+    if not isinstance(q, dict) or not all(key in q for key in ['question', 'options', 'correct']):
+        raise ValueError("Invalid question structure")
+    if not isinstance(q['question'], str) or not q['question'].strip():
+        raise ValueError("Question text must be a non-empty string")
+    if not isinstance(q['options'], list) or len(q['options']) != 4:
+        raise ValueError("Options must be a list of 4 items")
+    if not isinstance(q['correct'], int) or not (0 <= q['correct'] <= 3):
+        raise ValueError("Correct answer must be an integer 0-3")
+
+def normalize_question_text(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def question_text_hash(text):
+    return hashlib.sha1(normalize_question_text(text).encode('utf-8')).hexdigest()
+
+class QuestionRecord:
+    """A question with its options decoded and its API payload serialized once."""
+    __slots__ = ('id', 'question_text', 'options', 'correct_answer', 'payload')
+
+    def __init__(self, id, question_text, options, correct_answer):
+        self.id = id
+        self.question_text = question_text
+        self.options = tuple(options)
+        self.correct_answer = correct_answer
+        self.payload = json.dumps({
+            "question_id": id,
+            "question_text": question_text,
+            "options": options,
+            "correct_answer": correct_answer
+        })
+
+class QuestionPool:
+    """Questions of one (category, difficulty), addressed by integer position."""
+    __slots__ = ('key', 'version', 'loaded_at', 'records', 'ids', 'index')
+
+    def __init__(self, key, version, records):
+        self.key = key
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.records = tuple(records)
+        self.ids = tuple(record.id for record in self.records)
+        self.index = {question_id: i for i, question_id in enumerate(self.ids)}
+
+def _draw_indices(size, seen, count, rng):
+    """Pick up to `count` distinct positions in range(size) whose bit is clear in `seen`.
+
+    Rejection sampling costs O(count) draws while at least a quarter of the
+    pool is unseen; below that the few unseen positions are listed directly.
+    """
+    unseen = size - bin(seen).count('1')
+    if unseen <= 0:
+        return []
+    if unseen < 4 * count:
+        candidates = [i for i in range(size) if not seen >> i & 1]
+        return rng.sample(candidates, min(count, len(candidates)))
+    picked = []
+    taken = seen
+    while len(picked) < count:
+        i = rng.randrange(size)
+        if not taken >> i & 1:
+            taken |= 1 << i
+            picked.append(i)
+    return picked
+
+# ---------- SEEN MARKS ----------
+class LocalSeenMarks:
+    """In-process stand-in for the shared seen-mark feed.
+
+    mark_seen() already updated this process's bitsets, so there is nothing
+    to publish. With several workers and no shared backend, a worker picks
+    up other workers' marks when it reloads the pool.
+    """
+
+    def publish(self, user_id, question_ids):
+        pass
+
+    def poll(self):
+        return []
+
+    def clear(self):
+        pass
+
+class RedisSeenMarks:
+    """Seen marks shared by every worker through a Redis stream.
+
+    Entries older than `window` seconds are trimmed; a worker that has not
+    polled for that long may have missed some, so poll() returns None and
+    the caller rebuilds its bitsets from the database.
+    """
+
+    def __init__(self, url, key='vidyasetu:questions:seen', window=600, batch_size=1000):
+        import redis  # optional dependency, only needed when QUESTION_BANK_REDIS_URL is set
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._key = key
+        self.window = window
+        self.batch_size = batch_size
+        self._last_id = None
+        self._polled_at = None
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, question_ids):
+        oldest = int((time.time() - self.window) * 1000)
+        self._client.xadd(self._key, {'user_id': user_id, 'question_ids': ','.join(question_ids)},
+                          minid=oldest, approximate=True)
+
+    def poll(self):
+        """Marks published since the last poll as (user_id, [question_id]) pairs, or None."""
+        with self._lock:
+            now = time.time()
+            if self._last_id is None or now - self._polled_at > self.window:
+                self._last_id = f"{int(now * 1000)}-0"
+                self._polled_at = now
+                return None
+            marks = []
+            while True:
+                response = self._client.xread({self._key: self._last_id}, count=self.batch_size)
+                entries = response[0][1] if response else []
+                for entry_id, fields in entries:
+                    marks.append((fields['user_id'], fields['question_ids'].split(',')))
+                    self._last_id = entry_id
+                if len(entries) < self.batch_size:
+                    break
+            self._polled_at = now
+            return marks
+
+    def clear(self):
+        with self._lock:
+            self._last_id = None
+
+class QuestionBank:
+    """Per-process question pools and per-user seen bitsets for quiz draws.
+
+    Pools hold compact QuestionRecords, so a draw never touches ORM rows or
+    json.loads. Pools are reloaded when the shared bank version or their own
+    (category, difficulty) version moves, and after `ttl` seconds. A user's
+    bitset is built from user_seen_question once, then kept current by
+    mark_seen() and by the marks other workers publish through the shared
+    backend. It is rebuilt only when its pool's questions change.
+    """
+
+    def __init__(self, backend=None, ttl=300, max_seen_entries=10000):
+        self.backend = backend or LocalCatalogBackend()
+        self.seen_marks = LocalSeenMarks()
+        self.ttl = ttl
+        self.max_seen_entries = max_seen_entries
+        self._pools = {}
+        self._pool_backends = {}  # (category, difficulty) -> version backend of that pool
+        self._redis_url = None
+        self._seen = OrderedDict()  # (user_id, key) -> (pool, loaded_at, bits)
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def init_app(self, app):
+        redis_url = app.config.get('QUESTION_BANK_REDIS_URL')
+        if redis_url:
+            self.backend = RedisCatalogBackend(redis_url, key='vidyasetu:questions:version')
+            self.seen_marks = RedisSeenMarks(redis_url)
+        self._redis_url = redis_url
+        self._pool_backends = {}
+        self.ttl = app.config.get('QUESTION_BANK_CACHE_TTL', self.ttl)
+        self.clear()
+
+    @property
+    def version(self):
+        return self.backend.get_version()
+
+    def _pool_backend(self, key):
+        backend = self._pool_backends.get(key)
+        if backend is None:
+            with self._lock:
+                backend = self._pool_backends.get(key)
+                if backend is None:
+                    if self._redis_url:
+                        backend = RedisCatalogBackend(self._redis_url, key='vidyasetu:questions:version:' + ':'.join(key))
+                    else:
+                        backend = LocalCatalogBackend()
+                    self._pool_backends[key] = backend
+        return backend
+
+    def invalidate(self, category=None, difficulty=None):
+        """Call after committing question bank writes so every worker reloads.
+
+        With a category and difficulty only that pool (and the seen bitsets
+        built against it) is reloaded; without, everything is.
+        """
+        if category is None:
+            self.backend.bump_version()
+            self.clear()
+            return
+        key = (category, difficulty)
+        self._pool_backend(key).bump_version()
+        with self._lock:
+            self._pools.pop(key, None)
+            for cache_key in [cache_key for cache_key in self._seen if cache_key[1] == key]:
+                del self._seen[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._pools = {}
+            self._seen.clear()
+        self.seen_marks.clear()
+
+    # ---------- POOLS ----------
+    def pool(self, category, difficulty):
+        key = (category, difficulty)
+        version = (self.backend.get_version(), self._pool_backend(key).get_version())
+        pool = self._pools.get(key)
+        if pool and pool.version == version and time.monotonic() - pool.loaded_at < self.ttl:
+            return pool
+        rows = db.session.query(Question.id, Question.question_text, Question.options, Question.correct_answer).filter(
+            Question.game_category == category, Question.difficulty == difficulty
+        ).order_by(Question.created_at, Question.id)
+        records = []
+        for question_id, question_text, options, correct_answer in rows:
+            try:
+                records.append(QuestionRecord(question_id, question_text, json.loads(options), correct_answer))
+            except (TypeError, ValueError):
+                current_app.logger.warning(f"Skipping question {question_id}: options are not valid JSON")
+        old, pool = pool, QuestionPool(key, version, records)
+        with self._lock:
+            if old is not None and old.ids == pool.ids:
+                # Same questions in the same order: the bitsets still line up
+                for cache_key, entry in self._seen.items():
+                    if entry[0] is old:
+                        self._seen[cache_key] = (pool, entry[1], entry[2])
+            self._pools[key] = pool
+        return pool
+
+    # ---------- SEEN BITSETS ----------
+    def _seen_bits(self, user_id, pool):
+        cache_key = (user_id, pool.key)
+        with self._lock:
+            entry = self._seen.get(cache_key)
+            if entry and entry[0] is pool:
+                self._seen.move_to_end(cache_key)
+                return entry[2]
+
+        bits = 0
+        seen_ids = db.session.query(UserSeenQuestion.question_id).join(Question).filter(
+            UserSeenQuestion.user_id == user_id,
+            Question.game_category == pool.key[0],
+            Question.difficulty == pool.key[1]
+        )
+        for (question_id,) in seen_ids:
+            i = pool.index.get(question_id)
+            if i is not None:
+                bits |= 1 << i
+
+        with self._lock:
+            self._seen[cache_key] = (pool, time.monotonic(), bits)
+            self._seen.move_to_end(cache_key)
+            while len(self._seen) > self.max_seen_entries:
+                self._seen.popitem(last=False)
+        return bits
+
+    def mark_seen(self, user_id, question_ids):
+        """Set the bits of `question_ids` in the user's cached bitsets (after
+        committing them) and publish them to the other workers."""
+        question_ids = list(dict.fromkeys(question_ids))
+        if not question_ids:
+            return
+        self._apply_marks(user_id, question_ids)
+        self.seen_marks.publish(user_id, question_ids)
+
+    def _sync_seen(self):
+        """Apply the marks other workers published; rebuild every bitset if some were missed."""
+        marks = self.seen_marks.poll()
+        if marks is None:
+            with self._lock:
+                self._seen.clear()
+            return
+        for user_id, question_ids in marks:
+            self._apply_marks(user_id, question_ids)
+
+    def _apply_marks(self, user_id, question_ids):
+        with self._lock:
+            for pool in self._pools.values():
+                cache_key = (user_id, pool.key)
+                entry = self._seen.get(cache_key)
+                if not entry or entry[0] is not pool:
+                    continue
+                bits = entry[2]
+                for question_id in question_ids:
+                    i = pool.index.get(question_id)
+                    if i is not None:
+                        bits |= 1 << i
+                self._seen[cache_key] = (pool, entry[1], bits)
+
+    # ---------- DRAWS ----------
+    def draw(self, user_id, category, difficulty, count=DEFAULT_DRAW_SIZE):
+        """Return up to `count` random QuestionRecords `user_id` has not seen."""
+        pool = self.pool(category, difficulty)
+        if not pool.records:
+            return []
+        self._sync_seen()
+        bits = self._seen_bits(user_id, pool)
+        return [pool.records[i] for i in _draw_indices(len(pool.records), bits, count, self._random)]
+
+def questions_response(records):
+    """The get_questions JSON body, joined from the records' cached payloads."""
+    body = '{"questions": [' + ', '.join(record.payload for record in records) + ']}'
+    return current_app.response_class(body, mimetype='application/json')
+
+question_bank = QuestionBank()
+
+# ---------- SEEN HISTORY ----------
+def record_seen(user_id, question_ids):
+    """Insert the (user_id, question_id) pairs not stored yet with one statement.
+
+    Idempotent thanks to the unique constraint on the pair; ids that match no
+    question are skipped. The caller commits, then calls question_bank.mark_seen().
+    Returns (recorded, unknown).
+    """
+    question_ids = list(dict.fromkeys(question_ids))
+    known = [question_id for (question_id,) in db.session.query(Question.id).filter(Question.id.in_(question_ids))] if question_ids else []
+    if not known:
+        return 0, len(question_ids)
+
+    now = datetime.utcnow()
+    rows = [{"id": str(uuid.uuid4()), "user_id": user_id, "question_id": question_id, "seen_at": now} for question_id in known]
+    table = UserSeenQuestion.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        result = db.session.execute(
+            insert(table).values(rows).on_conflict_do_nothing(index_elements=['user_id', 'question_id'])
+        )
+        recorded = result.rowcount
+    else:
+        existing = {question_id for (question_id,) in db.session.query(UserSeenQuestion.question_id).filter(
+            UserSeenQuestion.user_id == user_id, UserSeenQuestion.question_id.in_(known)
+        )}
+        rows = [row for row in rows if row["question_id"] not in existing]
+        if rows:
+            db.session.execute(table.insert(), rows)
+        recorded = len(rows)
+    return recorded, len(question_ids) - len(known)
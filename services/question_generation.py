@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+from collections import deque
+import requests
+from flask import current_app
+from services.question_bank import question_bank, validate_question
+from services.question_import import save_questions
+
+MAX_GENERATE_COUNT = 20
+
+# Difficulties the prompts are asked for; each is its own question bank pool
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+
+# Prompt templates per game type; speed-typing has no questions
+PROMPTS = {
+    'code-quiz': "Generate {count} multiple-choice questions about programming concepts (HTML, CSS, JavaScript, Python) for {difficulty} difficulty. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
+    'ai-ml': "Generate {count} multiple-choice questions about Artificial Intelligence and Machine Learning for {difficulty} difficulty. Cover neural networks, algorithms, applications. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
+    'cyber-security': "Generate {count} multiple-choice questions about cybersecurity concepts for {difficulty} difficulty. Cover topics like passwords, phishing, encryption, etc. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
+    'data-science': "Generate {count} multiple-choice questions about data science and analytics for {difficulty} difficulty. Cover statistics, data visualization, machine learning basics. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
+    'web-dev': "Generate {count} multiple-choice questions about web development for {difficulty} difficulty. Cover HTML, CSS, JavaScript, frameworks. Each question should have 4 options with one correct answer. Format as JSON array of objects with keys: question, options (array), correct (index 0-3).",
+}
+
+# ---------- API ----------
+def request_questions(game_type, difficulty, count):
+    """Ask the configured chat-completions API for questions and validate them.
+
+    Raises requests.exceptions.RequestException, or ValueError/KeyError for a
+    malformed response.
+    """
+    headers = {
+        "Authorization": f"Bearer {current_app.config.get('SABANOVA_API_KEY', '')}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": "gpt-3.5-turbo",  # Assuming Sabanova supports this
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant that generates educational quiz questions. Always respond with valid JSON."},
+            {"role": "user", "content": PROMPTS[game_type].format(count=count, difficulty=difficulty)}
+        ],
+        "max_tokens": 2000,
+        "temperature": 0.7
+    }
+
+    response = requests.post(current_app.config.get('SABANOVA_API_URL', ''), headers=headers, json=payload,
+                             timeout=current_app.config.get('SABANOVA_API_TIMEOUT', 30))
+    response.raise_for_status()
+
+    result = response.json()
+    content = result['choices'][0]['message']['content']
+
+    # Parse and validate the JSON response
+    questions = json.loads(content)
+    if not isinstance(questions, list):
+        raise ValueError("Response is not a list")
+    for q in questions:
+        validate_question(q)
+    return questions
+
+# ---------- CACHE AND PREFETCH ----------
+class QuestionGenerator:
+    """Serves generate_questions from prefetched buffers and a result cache.
+
+    Order of preference: `count` questions from the (game type, difficulty)
+    buffer, then the cached result of an identical (game type, difficulty,
+    count) request younger than `ttl`, and only then a blocking API call.
+    Every generated question is also saved into the question bank.
+
+    With prefetch enabled a daemon thread per worker keeps the buffer of each
+    requested (game type, difficulty) topped up to `buffer_size`.
+    """
+
+    def __init__(self, ttl=600, buffer_size=30, batch_size=10, prefetch=False, retry_interval=30):
+        self.ttl = ttl
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.retry_interval = retry_interval
+        self.app = None
+        self._results = {}  # (game_type, difficulty, count) -> (created_at, questions)
+        self._buffers = {}  # (game_type, difficulty) -> deque of questions
+        self._wanted = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config.get('QUESTION_GENERATION_CACHE_TTL', self.ttl)
+        self.buffer_size = app.config.get('QUESTION_PREFETCH_BUFFER', self.buffer_size)
+        self.prefetch = app.config.get('QUESTION_PREFETCH', self.prefetch)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._results = {}
+            self._buffers = {}
+            self._wanted = set()
+
+    def _generate(self, game_type, difficulty, count, invalidate=True):
+        questions = request_questions(game_type, difficulty, count)
+        inserted = save_questions(questions, game_type, difficulty, invalidate=invalidate)
+        return questions, inserted
+
+    def get(self, game_type, difficulty, count):
+        key = (game_type, difficulty)
+        with self._lock:
+            buffer = self._buffers.setdefault(key, deque())
+            taken = [buffer.popleft() for _ in range(count)] if len(buffer) >= count else None
+            cached = self._results.get((game_type, difficulty, count))
+        if self.prefetch:
+            self._want(key)
+        if taken:
+            return taken
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        questions, _ = self._generate(game_type, difficulty, count)
+        with self._lock:
+            self._results[(game_type, difficulty, count)] = (time.monotonic(), questions)
+        return questions
+
+    def buffered(self, game_type, difficulty):
+        with self._lock:
+            return len(self._buffers.get((game_type, difficulty), ()))
+
+    # ---------- PREFETCH WORKER ----------
+    def _want(self, key):
+        with self._lock:
+            self._wanted.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='question-prefetch', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def fill(self, key):
+        """Generate batches until the key's buffer is full. Needs an app context.
+
+        The question bank pool is reloaded once at the end of the run rather
+        than after every batch.
+        """
+        inserted = 0
+        try:
+            while True:
+                with self._lock:
+                    missing = self.buffer_size - len(self._buffers.setdefault(key, deque()))
+                if missing <= 0:
+                    return
+                questions, batch_inserted = self._generate(key[0], key[1], min(self.batch_size, missing), invalidate=False)
+                inserted += batch_inserted
+                if not questions:
+                    return
+                with self._lock:
+                    self._buffers[key].extend(questions)
+        finally:
+            if inserted:
+                question_bank.invalidate(key[0], key[1])
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=self.retry_interval)
+            self._wakeup.clear()
+            with self._lock:
+                wanted = list(self._wanted)
+            for key in wanted:
+                with self.app.app_context():
+                    try:
+                        self.fill(key)
+                    except Exception as e:
+                        # Retried on the next wakeup or after retry_interval
+                        current_app.logger.error(f"Question prefetch for {key} failed: {e}")
+
+question_generator = QuestionGenerator()
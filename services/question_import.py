@@ -0,0 +1,161 @@
+import csv
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from models import db, Question
+from services.question_bank import question_bank, question_text_hash, validate_question
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 10
+
+# CSV header: question,option_1,option_2,option_3,option_4,correct[,category][,difficulty]
+CSV_OPTION_COLUMNS = ('option_1', 'option_2', 'option_3', 'option_4')
+
+# ---------- READERS ----------
+def _read_jsonl(f):
+    """Yield (line number, question dict) from a file of JSON objects, one per line."""
+    for line_number, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+
+def _read_csv(f):
+    for line_number, row in enumerate(csv.DictReader(f), 2):
+        try:
+            yield line_number, {
+                "question": row['question'],
+                "options": [row[column] for column in CSV_OPTION_COLUMNS],
+                "correct": int(row['correct']),
+                "category": row.get('category') or None,
+                "difficulty": row.get('difficulty') or None
+            }
+        except (KeyError, TypeError, ValueError):
+            yield line_number, ValueError("Invalid CSV row")
+
+READERS = {'jsonl': _read_jsonl, 'csv': _read_csv}
+
+# ---------- IMPORT ----------
+def _question_row(q, category, difficulty, text_hash, created_at):
+    return {
+        "id": str(uuid.uuid4()),
+        "game_category": category,
+        "difficulty": difficulty,
+        "question_text": q['question'].strip(),
+        "options": json.dumps(q['options']),
+        "correct_answer": q['correct'],
+        "text_hash": text_hash,
+        "created_at": created_at
+    }
+
+def _insert_chunk(chunk, stats, dry_run=False):
+    """Insert the chunk's rows whose (category, text hash) is not stored yet, then commit."""
+    hashes = {row["text_hash"] for row in chunk}
+    existing = set(db.session.query(Question.game_category, Question.text_hash).filter(Question.text_hash.in_(hashes)))
+    rows = [row for row in chunk if (row["game_category"], row["text_hash"]) not in existing]
+    if rows and not dry_run:
+        db.session.execute(db.insert(Question), rows)
+        db.session.commit()
+    stats["inserted"] += len(rows)
+    stats["duplicates"] += len(chunk) - len(rows)
+
+def import_questions(f, file_format, category=None, difficulty=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Stream questions from an open file into the question table.
+
+    Rows are validated like generate_questions output, deduplicated by
+    normalized text hash per category (within the file and against the table)
+    and written with one executemany INSERT and commit per chunk; with
+    `dry_run` nothing is written but the counts are the same. Lines may carry their
+    own `category`/`difficulty`; otherwise the defaults are used.
+    """
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    seen = set()
+    chunk = []
+    now = datetime.utcnow()
+    for line_number, q in READERS[file_format](f):
+        stats["read"] += 1
+        try:
+            if isinstance(q, Exception):
+                raise q
+            validate_question(q)
+            row_category = q.get('category') or category
+            row_difficulty = q.get('difficulty') or difficulty
+            if not row_category or not row_difficulty:
+                raise ValueError("Category and difficulty are required")
+            if not isinstance(q['question'], str) or not q['question'].strip():
+                raise ValueError("Question text is required")
+        except ValueError as e:
+            stats["invalid"] += 1
+            if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                stats["errors"].append(f"line {line_number}: {e}")
+            continue
+
+        text_hash = question_text_hash(q['question'])
+        if (row_category, text_hash) in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add((row_category, text_hash))
+        chunk.append(_question_row(q, row_category, row_difficulty, text_hash, now))
+        if len(chunk) >= chunk_size:
+            _insert_chunk(chunk, stats, dry_run)
+            chunk = []
+    if chunk:
+        _insert_chunk(chunk, stats, dry_run)
+    if stats["inserted"] and not dry_run:
+        question_bank.invalidate()
+    return stats
+
+def save_questions(questions, category, difficulty, invalidate=True):
+    """Store already validated question dicts, skipping ones the bank has. Commits.
+
+    Returns the number of questions inserted. Pass invalidate=False to
+    reload the (category, difficulty) pool yourself after several saves.
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for q in questions:
+        text_hash = question_text_hash(q['question'])
+        rows.setdefault(text_hash, _question_row(q, category, difficulty, text_hash, now))
+    stats = {"inserted": 0, "duplicates": 0}
+    if rows:
+        _insert_chunk(list(rows.values()), stats)
+    if stats["inserted"] and invalidate:
+        question_bank.invalidate(category, difficulty)
+    return stats["inserted"]
+
+@click.command('import-questions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(sorted(READERS)), default=None,
+              help='File format. [default: from the file extension]')
+@click.option('--category', default=None, help='game_category for rows that do not set one.')
+@click.option('--difficulty', default=None, help='Difficulty for rows that do not set one.')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Rows per INSERT and commit.')
+@click.option('--dry-run', is_flag=True, help='Validate and count without writing.')
+@with_appcontext
+def import_questions_command(path, file_format, category, difficulty, chunk_size, dry_run):
+    """Bulk import quiz questions from a JSONL or CSV file.
+
+    JSONL lines use the generate_questions shape:
+    {"question": ..., "options": [4 items], "correct": 0-3, "category": ..., "difficulty": ...}.
+    CSV files need the columns question, option_1..option_4 and correct.
+    """
+    if file_format is None:
+        file_format = 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl'
+
+    started = time.perf_counter()
+    with open(path, newline='', encoding='utf-8') as f:
+        stats = import_questions(f, file_format, category, difficulty, chunk_size, dry_run)
+    elapsed = time.perf_counter() - started
+
+    for error in stats["errors"]:
+        click.echo(f"  {error}", err=True)
+    click.echo(
+        f"Read {stats['read']} row(s): {'would insert' if dry_run else 'inserted'} "
+        f"{stats['inserted']}, {stats['duplicates']} duplicate(s), {stats['invalid']} invalid."
+    )
+    click.echo(f"{elapsed:.2f}s, {stats['read'] / elapsed if elapsed else 0:.0f} rows/s.")
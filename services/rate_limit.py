@@ -0,0 +1,187 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_login import current_user
+
+# name -> (per-IP limit, per-account limit); each is (capacity, seconds to refill it)
+LIMITS = {
+    'chat': ((30, 60), (30, 60)),
+    'chat_escalate': ((5, 600), (3, 600)),
+    'login_otp': ((10, 900), (3, 900)),
+    'signup': ((10, 3600), (3, 900)),
+    'enquiry': ((5, 600), (3, 3600)),
+    'generate_questions': ((20, 600), (20, 600)),
+}
+
+# ---------- BUCKET STORES ----------
+class LocalRateLimitStore:
+    """In-process token buckets.
+
+    Stand-in for the shared store: fine for a single worker and for tests.
+    With several workers each one enforces the limits separately. The least
+    recently used buckets beyond `max_entries` are dropped (i.e. refilled).
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        """Take one token. Returns seconds until one is available (0 when taken)."""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets = OrderedDict()
+
+# Same arithmetic as LocalRateLimitStore.take, atomic on the Redis side
+_TAKE_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker through Redis."""
+
+    def __init__(self, url, prefix='vidyasetu:ratelimit:'):
+        import redis  # optional dependency, only needed when RATE_LIMIT_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key, capacity, rate, now):
+        return float(self._take(keys=[self._prefix + key], args=[capacity, rate, now]))
+
+    def clear(self):
+        pass
+
+# ---------- LIMITER ----------
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after, status=429):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+        self.status = status
+
+class RateLimiter:
+    """Token buckets per client IP and per account, plus a per-process cap
+    on concurrent requests for each limited endpoint group.
+
+    The concurrency cap is the backpressure: when a group already occupies
+    `max_inflight` worker threads (slow SMTP, a burst of signups) further
+    requests get a 503 with Retry-After instead of queueing behind them, so
+    the remaining threads stay free for everything else.
+    """
+
+    def __init__(self, store=None, enabled=True, max_inflight=8):
+        self.store = store or LocalRateLimitStore()
+        self.enabled = enabled
+        self.max_inflight = max_inflight
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        redis_url = app.config.get('RATE_LIMIT_REDIS_URL')
+        if redis_url:
+            self.store = RedisRateLimitStore(redis_url)
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', self.enabled)
+        self.max_inflight = app.config.get('RATE_LIMIT_MAX_INFLIGHT', self.max_inflight)
+        self.clear()
+
+    def clear(self):
+        self.store.clear()
+        with self._lock:
+            self._inflight = {}
+
+    def hit(self, name, account=None):
+        """Take a token from the IP bucket and, if given, the account bucket of `name`.
+
+        Raises RateLimitExceeded with the wait in seconds when either is empty.
+        """
+        now = time.time()
+        keys = [((f"{name}:ip:{request.remote_addr}"), LIMITS[name][0])]
+        if account:
+            keys.append((f"{name}:account:{str(account).strip().lower()}", LIMITS[name][1]))
+        for key, (capacity, period) in keys:
+            wait = self.store.take(key, capacity, capacity / period, now)
+            if wait:
+                raise RateLimitExceeded(wait)
+
+    def _semaphore(self, name):
+        with self._lock:
+            semaphore = self._inflight.get(name)
+            if semaphore is None:
+                semaphore = self._inflight[name] = threading.BoundedSemaphore(self.max_inflight)
+            return semaphore
+
+    def limit(self, name, account=None, body=None, methods=("POST",)):
+        """View decorator applying the `name` limits to requests using `methods`.
+
+        `account` is a callable returning the account key (user id, email) or
+        None; `body` builds the JSON payload of the refusal from its message.
+        """
+        if name not in LIMITS:
+            raise ValueError(f"Unknown rate limit '{name}'")
+        body = body or (lambda message: {"success": False, "message": message})
+
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if not self.enabled or request.method not in methods:
+                    return view(*args, **kwargs)
+                semaphore = self._semaphore(name)
+                # Check capacity first so a request refused with 503 keeps its tokens
+                acquired = semaphore.acquire(blocking=False)
+                try:
+                    if not acquired:
+                        raise RateLimitExceeded(1, status=503)
+                    self.hit(name, account() if account else None)
+                    return view(*args, **kwargs)
+                except RateLimitExceeded as e:
+                    retry_after = max(1, math.ceil(e.retry_after))
+                    current_app.logger.warning(f"Rate limit '{name}' refused {request.remote_addr} ({e.status}, retry in {retry_after}s)")
+                    response = jsonify(body(f"Too many requests. Please try again in {retry_after} seconds."))
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response, e.status
+                finally:
+                    if acquired:
+                        semaphore.release()
+            return wrapped
+        return decorator
+
+rate_limiter = RateLimiter()
+rate_limit = rate_limiter.limit
+
+# ---------- ACCOUNT KEYS ----------
+def request_field(field):
+    """Account key from a JSON body or form field (e.g. the email an OTP goes to)."""
+    def account():
+        data = request.get_json(silent=True) or request.form
+        value = data.get(field) if hasattr(data, 'get') else None
+        return value if isinstance(value, str) and value.strip() else None
+    return account
+
+def logged_in_user():
+    """Account key for authenticated users; anonymous requests are limited per IP only."""
+    return current_user.id if current_user.is_authenticated else None
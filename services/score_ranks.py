@@ -0,0 +1,146 @@
+from collections import Counter
+from datetime import datetime
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import db, BootstrapMarker, GameScore, ScoreBucket
+
+DEFAULT_BUCKET_WIDTH = 10
+
+def bucket_width():
+    if has_app_context():
+        return current_app.config.get('SCORE_BUCKET_WIDTH', DEFAULT_BUCKET_WIDTH)
+    return DEFAULT_BUCKET_WIDTH
+
+# ---------- HISTOGRAM MAINTENANCE ----------
+def _add_to_bucket(connection, game_type, bucket, delta):
+    table = ScoreBucket.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        connection.execute(
+            insert(table).values(game_type=game_type, bucket=bucket, count=delta)
+            .on_conflict_do_update(index_elements=['game_type', 'bucket'], set_={'count': table.c.count + delta})
+        )
+        return
+    result = connection.execute(
+        table.update()
+        .where(table.c.game_type == game_type, table.c.bucket == bucket)
+        .values(count=table.c.count + delta)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(game_type=game_type, bucket=bucket, count=delta))
+
+def apply_bucket_deltas(connection, deltas):
+    """Apply {(game_type, bucket): delta} to score_bucket."""
+    for (game_type, bucket), delta in deltas.items():
+        if delta:
+            _add_to_bucket(connection, game_type, bucket, delta)
+
+@event.listens_for(Session, "after_flush")
+def _update_buckets(session, flush_context):
+    """Count new and deleted GameScore rows in the same transaction.
+
+    Bulk Query.delete() calls bypass the unit of work; use forget_scores()
+    before them.
+    """
+    width = bucket_width()
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, GameScore):
+            deltas[(obj.game_type, obj.score // width)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, GameScore):
+            deltas[(obj.game_type, obj.score // width)] -= 1
+    if deltas:
+        apply_bucket_deltas(session.connection(), deltas)
+
+def forget_scores(*criteria):
+    """Take the GameScore rows matching `criteria` out of the histograms before a bulk delete."""
+    width = bucket_width()
+    deltas = Counter()
+    rows = db.session.query(GameScore.game_type, GameScore.score, db.func.count(GameScore.id)).filter(
+        *criteria
+    ).group_by(GameScore.game_type, GameScore.score)
+    for game_type, score, count in rows:
+        deltas[(game_type, score // width)] -= count
+    apply_bucket_deltas(db.session.connection(), deltas)
+
+def rebuild_score_buckets():
+    """Recompute every histogram from game_score."""
+    width = bucket_width()
+    counts = Counter()
+    rows = db.session.query(GameScore.game_type, GameScore.score, db.func.count(GameScore.id)).group_by(
+        GameScore.game_type, GameScore.score
+    )
+    for game_type, score, count in rows:
+        counts[(game_type, score // width)] += count
+    db.session.query(ScoreBucket).delete()
+    if counts:
+        db.session.execute(db.insert(ScoreBucket), [
+            {"game_type": game_type, "bucket": bucket, "count": count}
+            for (game_type, bucket), count in counts.items()
+        ])
+    db.session.commit()
+
+def bootstrap_score_buckets():
+    """Build the histograms on first run and whenever SCORE_BUCKET_WIDTH changes.
+
+    The marker's version records the bucket width the rows were built with.
+    """
+    width = bucket_width()
+    marker = db.session.get(BootstrapMarker, 'score_buckets')
+    if marker and marker.version == width:
+        return False
+    rebuild_score_buckets()
+    db.session.merge(BootstrapMarker(name='score_buckets', version=width, applied_on=datetime.utcnow()))
+    db.session.commit()
+    return True
+
+# ---------- RANK LOOKUP ----------
+def score_rank(game_type, score):
+    """Rank of `score` among all scores of `game_type`.
+
+    Scores in higher buckets come from the histogram; only the scores sharing
+    this score's bucket are counted from game_score, an index range scan of at
+    most one bucket.
+    """
+    width = bucket_width()
+    bucket = score // width
+    total, above = db.session.query(
+        db.func.coalesce(db.func.sum(ScoreBucket.count), 0),
+        db.func.coalesce(db.func.sum(db.case((ScoreBucket.bucket > bucket, ScoreBucket.count), else_=0)), 0)
+    ).filter(ScoreBucket.game_type == game_type).one()
+    above += db.session.query(db.func.count(GameScore.id)).filter(
+        GameScore.game_type == game_type,
+        GameScore.score > score,
+        GameScore.score < (bucket + 1) * width
+    ).scalar()
+    return {
+        "score": score,
+        "rank": above + 1,
+        "total": total,
+        "percentile": round(100.0 * (total - above) / total, 1) if total else None
+    }
+
+def best_scores(user_id=None, username=None):
+    """Return {game_type: best score} for a user, or for a guest by username."""
+    query = db.session.query(GameScore.game_type, db.func.max(GameScore.score))
+    if user_id:
+        query = query.filter(GameScore.user_id == user_id)
+    else:
+        query = query.filter(GameScore.username == username)
+    return dict(query.group_by(GameScore.game_type).all())
+
+@click.command('rebuild-score-buckets')
+@with_appcontext
+def rebuild_score_buckets_command():
+    """Recompute the per-game score histograms used for rank lookups."""
+    rebuild_score_buckets()
+    db.session.merge(BootstrapMarker(name='score_buckets', version=bucket_width(), applied_on=datetime.utcnow()))
+    db.session.commit()
+    click.echo("Score histograms rebuilt.")
@@ -0,0 +1,291 @@
+import bisect
+import difflib
+import re
+import threading
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from models import db, Certificate, Course, Enquiry, User
+from services.catalog import course_catalog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+MAX_SUGGESTIONS = 8
+
+# Fraction of similarity difflib needs before a misspelt term is replaced
+TYPO_CUTOFF = 0.75
+
+# ---------- INDEX DDL ----------
+# SQLite: an FTS5 table holding its own copy of the searchable columns, kept
+# in sync by triggers, so bulk inserts (seed_courses) and raw SQL writes are
+# indexed too. It is not an external-content table because course has no
+# INTEGER PRIMARY KEY and VACUUM may renumber its rowids.
+SQLITE_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5("
+    "course_id UNINDEXED, title, category, type, description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_insert AFTER INSERT ON course BEGIN "
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "VALUES (new.id, new.title, new.category, new.type, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_update AFTER UPDATE ON course BEGIN "
+    "DELETE FROM course_fts WHERE course_id = old.id; "
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "VALUES (new.id, new.title, new.category, new.type, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_delete AFTER DELETE ON course BEGIN "
+    "DELETE FROM course_fts WHERE course_id = old.id; END",
+)
+
+SQLITE_DROP_DDL = (
+    "DROP TRIGGER IF EXISTS course_fts_delete",
+    "DROP TRIGGER IF EXISTS course_fts_update",
+    "DROP TRIGGER IF EXISTS course_fts_insert",
+    "DROP TABLE IF EXISTS course_fts",
+)
+
+SQLITE_REBUILD_SQL = (
+    "DELETE FROM course_fts",
+    "INSERT INTO course_fts (course_id, title, category, type, description) "
+    "SELECT id, title, category, type, description FROM course",
+)
+
+# Postgres: a GIN index over the same tsvector expression the queries use,
+# so it can never drift from the table.
+POSTGRES_DOCUMENT = (
+    "to_tsvector('simple', coalesce(course.title, '') || ' ' || coalesce(replace(course.category, '_', ' '), '') "
+    "|| ' ' || coalesce(course.type, '') || ' ' || coalesce(course.description, ''))"
+)
+
+POSTGRES_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_course_search ON course USING gin ("
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(replace(category, '_', ' '), '') "
+    "|| ' ' || coalesce(type, '') || ' ' || coalesce(description, '')))",
+)
+
+POSTGRES_DROP_DDL = (
+    "DROP INDEX IF EXISTS ix_course_search",
+)
+
+def create_search_index(connection):
+    """Create the dialect's search index objects (no-op on other databases)."""
+    statements = {'sqlite': SQLITE_INDEX_DDL, 'postgresql': POSTGRES_INDEX_DDL}.get(connection.dialect.name, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+    if connection.dialect.name == 'sqlite':
+        for statement in SQLITE_REBUILD_SQL:
+            connection.exec_driver_sql(statement)
+
+def drop_search_index(connection):
+    statements = {'sqlite': SQLITE_DROP_DDL, 'postgresql': POSTGRES_DROP_DDL}.get(connection.dialect.name, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+@event.listens_for(Course.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    # db.create_all() databases get the index too; migrated ones get it from Alembic
+    create_search_index(connection)
+
+@event.listens_for(Course.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+# ---------- QUERY TERMS ----------
+_vocabulary = None
+_lock = threading.Lock()
+
+def _tokens(text):
+    return TOKEN_RE.findall((text or '').replace('_', ' ').lower())
+
+def vocabulary():
+    """Sorted indexed terms of the current catalog snapshot, for typo correction."""
+    global _vocabulary
+    courses = course_catalog.all()
+    cached = _vocabulary
+    if cached is None or cached[0] is not courses:
+        with _lock:
+            terms = set()
+            for course in courses:
+                for text in (course.title, course.category, course.type, course.description):
+                    terms.update(_tokens(text))
+            cached = _vocabulary = (courses, sorted(terms))
+    return cached[1]
+
+def query_terms(query):
+    """Turn a search box string into [[alternatives], ...], one list per word.
+
+    A word that is a prefix of an indexed term is kept as a prefix search.
+    Otherwise the closest indexed terms stand in for it, which makes
+    misspellings match. Words with no close term are kept so they match
+    nothing.
+    """
+    terms = vocabulary()
+    groups = []
+    for word in _tokens(query):
+        position = bisect.bisect_left(terms, word)
+        if position < len(terms) and terms[position].startswith(word):
+            groups.append([word])
+        else:
+            groups.append(difflib.get_close_matches(word, terms, n=3, cutoff=TYPO_CUTOFF) or [word])
+    return groups
+
+def _fts5_match(groups):
+    # Quoted terms never parse as FTS5 operators; * makes each a prefix query
+    return " AND ".join("(" + " OR ".join(f'"{term}"*' for term in group) + ")" for group in groups)
+
+def _tsquery(groups):
+    return " & ".join("(" + " | ".join(f"{term}:*" for term in group) + ")" for group in groups)
+
+# ---------- SEARCH ----------
+def _ranked_ids_statement(groups, limit):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # bm25 weights per column: course_id, title, category, type, description
+        sql = ("SELECT course_id FROM course_fts WHERE course_fts MATCH :match "
+               "ORDER BY bm25(course_fts, 0.0, 10.0, 4.0, 2.0, 1.0)")
+        params = {'match': _fts5_match(groups)}
+    elif dialect == 'postgresql':
+        sql = (f"SELECT id AS course_id FROM course WHERE {POSTGRES_DOCUMENT} @@ to_tsquery('simple', :match) "
+               f"ORDER BY ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', :match)) DESC")
+        params = {'match': _tsquery(groups)}
+    else:
+        return None
+    if limit:
+        sql += " LIMIT :limit"
+        params['limit'] = limit
+    return db.text(sql).bindparams(**params)
+
+def _substring_filter(query):
+    # Databases without a full-text index keep the old substring search
+    return db.or_(
+        Course.title.ilike(f'%{query}%'),
+        Course.category.ilike(f'%{query}%'),
+        Course.description.ilike(f'%{query}%')
+    )
+
+def search_course_ids(query, limit=None):
+    """Ids of the courses matching `query`, best match first."""
+    groups = query_terms(query)
+    if not groups:
+        return []
+    statement = _ranked_ids_statement(groups, limit)
+    if statement is None:
+        rows = db.session.query(Course.id).filter(_substring_filter(query)).order_by(Course.title).limit(limit).all()
+    else:
+        rows = db.session.execute(statement).all()
+    return [row[0] for row in rows]
+
+def search_courses(query, limit=None):
+    """Matching courses as CourseRecord from the catalog cache, best match first."""
+    records = (course_catalog.get(course_id) for course_id in search_course_ids(query, limit))
+    return [record for record in records if record is not None]
+
+def course_search_filter(query):
+    """Criterion selecting the courses matching `query`, for composing with other filters."""
+    groups = query_terms(query)
+    if not groups:
+        return db.false()
+    statement = _ranked_ids_statement(groups, None)
+    if statement is None:
+        return _substring_filter(query)
+    return Course.id.in_(statement.columns(db.column('course_id')))
+
+def suggest(query, limit=MAX_SUGGESTIONS):
+    """Autocomplete entries for a partially typed query."""
+    return [
+        {"id": course.id, "title": course.title, "category": course.category, "fee": course.fee}
+        for course in search_courses(query, limit)
+    ]
+
+# ---------- ADMIN PANEL SEARCH ----------
+# Tables the admin panel searches by substring -> searched columns. SQLite
+# gets an FTS5 trigram table per table (kept in sync by triggers, like
+# course_fts), Postgres a pg_trgm GIN index per column, which ILIKE uses.
+SUBSTRING_INDEXES = {
+    'user': ('username', 'email', 'full_name'),
+    'certificate': ('username', 'course_title'),
+    'enquiry': ('name', 'email', 'course', 'message'),
+}
+
+# Trigram MATCH needs at least this many characters; shorter terms scan
+MIN_TRIGRAM_LENGTH = 3
+
+def substring_index_ddl(table, dialect):
+    """(create, drop, rebuild) statements of the substring index on `table`."""
+    columns = SUBSTRING_INDEXES[table]
+    if dialect == 'sqlite':
+        fts = f"{table}_fts"
+        listed = ", ".join(columns)
+        values = ", ".join(f"new.{column}" for column in columns)
+        insert = f"INSERT INTO {fts} (row_id, {listed}) VALUES (new.id, {values});"
+        create = (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(row_id UNINDEXED, {listed}, tokenize='trigram')",
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON "{table}" BEGIN {insert} END',
+            # Only the searched columns: user rows are updated on every notification
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {listed} ON "{table}" BEGIN '
+            f"DELETE FROM {fts} WHERE row_id = old.id; {insert} END",
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON "{table}" BEGIN '
+            f"DELETE FROM {fts} WHERE row_id = old.id; END",
+        )
+        drop = (
+            f"DROP TRIGGER IF EXISTS {fts}_delete",
+            f"DROP TRIGGER IF EXISTS {fts}_update",
+            f"DROP TRIGGER IF EXISTS {fts}_insert",
+            f"DROP TABLE IF EXISTS {fts}",
+        )
+        rebuild = (
+            f"DELETE FROM {fts}",
+            f'INSERT INTO {fts} (row_id, {listed}) SELECT id, {listed} FROM "{table}"',
+        )
+        return create, drop, rebuild
+    if dialect == 'postgresql':
+        create = ("CREATE EXTENSION IF NOT EXISTS pg_trgm",) + tuple(
+            f'CREATE INDEX IF NOT EXISTS ix_trgm_{table}_{column} ON "{table}" USING gin ({column} gin_trgm_ops)'
+            for column in columns
+        )
+        drop = tuple(f"DROP INDEX IF EXISTS ix_trgm_{table}_{column}" for column in columns)
+        return create, drop, ()
+    return (), (), ()
+
+def create_substring_index(connection, table):
+    create, _, rebuild = substring_index_ddl(table, connection.dialect.name)
+    for statement in create + rebuild:
+        connection.exec_driver_sql(statement)
+
+def drop_substring_index(connection, table):
+    for statement in substring_index_ddl(table, connection.dialect.name)[1]:
+        connection.exec_driver_sql(statement)
+
+def _listen_substring_index(model):
+    table = model.__table__.name
+    event.listen(model.__table__, "after_create", lambda target, connection, **kw: create_substring_index(connection, table))
+    event.listen(model.__table__, "before_drop", lambda target, connection, **kw: drop_substring_index(connection, table))
+
+for _model in (User, Certificate, Enquiry):
+    _listen_substring_index(_model)
+
+def substring_filter(model, columns, query):
+    """Criterion: any of `columns` of `model` contains `query`, ignoring case.
+
+    Served by the table's substring index: the FTS5 trigram table on SQLite,
+    the pg_trgm indexes (through ILIKE) on Postgres.
+    """
+    table = model.__table__.name
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite' and table in SUBSTRING_INDEXES and len(query) >= MIN_TRIGRAM_LENGTH:
+        match = "{" + " ".join(columns) + '} : "' + query.replace('"', '""') + '"'
+        ids = db.text(f"SELECT row_id FROM {table}_fts WHERE {table}_fts MATCH :{table}_match").bindparams(
+            **{f"{table}_match": match}
+        ).columns(db.column('row_id'))
+        return model.id.in_(ids)
+    return db.or_(*(getattr(model, column).ilike(f'%{query}%') for column in columns))
+
+# ---------- CLI ----------
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Recreate the course search index and the admin panel substring indexes."""
+    with db.engine.begin() as connection:
+        drop_search_index(connection)
+        create_search_index(connection)
+        for table in SUBSTRING_INDEXES:
+            drop_substring_index(connection, table)
+            create_substring_index(connection, table)
+    click.echo(f"Search index rebuilt for {db.session.query(db.func.count(Course.id)).scalar()} courses ({db.engine.dialect.name}).")
@@ -0,0 +1,134 @@
+from datetime import datetime
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, User, Course, Enrollment, Payment, StatCounter
+
+COUNTER_NAMES = ('users', 'courses', 'enrollments', 'revenue')
+
+# ---------- AGGREGATES ----------
+def _aggregate_stats():
+    """Compute every dashboard number with COUNT/SUM queries."""
+    return {
+        "total_users": db.session.query(db.func.count(User.id)).scalar(),
+        "total_courses": db.session.query(db.func.count(Course.id)).scalar(),
+        "total_enrollments": db.session.query(db.func.count(Enrollment.id)).filter(Enrollment.status != 'cancelled').scalar(),
+        "total_revenue": db.session.query(db.func.coalesce(db.func.sum(Payment.amount), 0)).filter(Payment.status == 'completed').scalar()
+    }
+
+def _stats_from_counters(values):
+    return {
+        "total_users": int(values['users']),
+        "total_courses": int(values['courses']),
+        "total_enrollments": int(values['enrollments']),
+        "total_revenue": values['revenue']
+    }
+
+def counters_enabled():
+    return has_app_context() and current_app.config.get('STATS_COUNTERS', False)
+
+def rebuild_counters():
+    """Reset the materialized counters from the aggregate queries."""
+    stats = _aggregate_stats()
+    values = {
+        'users': stats['total_users'],
+        'courses': stats['total_courses'],
+        'enrollments': stats['total_enrollments'],
+        'revenue': stats['total_revenue']
+    }
+    for name, value in values.items():
+        db.session.merge(StatCounter(name=name, value=value, updated_on=datetime.utcnow()))
+    db.session.commit()
+    return stats
+
+def get_dashboard_stats():
+    """Return the admin dashboard `stats` block (cancelled enrollments excluded).
+
+    With STATS_COUNTERS enabled the numbers are read from the stat_counter rows
+    (one primary-key lookup each); otherwise they come from aggregate queries.
+    """
+    if not counters_enabled():
+        return _aggregate_stats()
+
+    values = dict(db.session.query(StatCounter.name, StatCounter.value).all())
+    if not all(name in values for name in COUNTER_NAMES):
+        return rebuild_counters()
+    return _stats_from_counters(values)
+
+# ---------- COUNTER MAINTENANCE ----------
+def _old_value(obj, attr):
+    """Value of `attr` as last loaded from the database."""
+    history = db.inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+def _enrollment_weight(status):
+    return 0 if status == 'cancelled' else 1
+
+def _payment_weight(status, amount):
+    return (amount or 0) if status == 'completed' else 0
+
+# Make status/amount changes keep the previous value in the attribute history
+# even when the instance was expired by an earlier commit.
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+for _attribute in (Enrollment.status, Payment.status, Payment.amount):
+    event.listen(_attribute, "set", _keep_old_value, active_history=True)
+
+@event.listens_for(Session, "after_flush")
+def _update_counters(session, flush_context):
+    """Apply per-flush deltas to stat_counter inside the same transaction.
+
+    Bulk Query.update()/delete() calls bypass the ORM unit of work; callers that
+    use them must call rebuild_counters() afterwards.
+    """
+    if not counters_enabled():
+        return
+
+    deltas = dict.fromkeys(COUNTER_NAMES, 0)
+    for obj in session.new:
+        if isinstance(obj, User):
+            deltas['users'] += 1
+        elif isinstance(obj, Course):
+            deltas['courses'] += 1
+        elif isinstance(obj, Enrollment):
+            deltas['enrollments'] += _enrollment_weight(obj.status)
+        elif isinstance(obj, Payment):
+            deltas['revenue'] += _payment_weight(obj.status, obj.amount)
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            deltas['users'] -= 1
+        elif isinstance(obj, Course):
+            deltas['courses'] -= 1
+        elif isinstance(obj, Enrollment):
+            deltas['enrollments'] -= _enrollment_weight(_old_value(obj, 'status'))
+        elif isinstance(obj, Payment):
+            deltas['revenue'] -= _payment_weight(_old_value(obj, 'status'), _old_value(obj, 'amount'))
+
+    for obj in session.dirty:
+        if isinstance(obj, Enrollment):
+            deltas['enrollments'] += _enrollment_weight(obj.status) - _enrollment_weight(_old_value(obj, 'status'))
+        elif isinstance(obj, Payment):
+            deltas['revenue'] += (_payment_weight(obj.status, obj.amount)
+                                  - _payment_weight(_old_value(obj, 'status'), _old_value(obj, 'amount')))
+
+    connection = session.connection()
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                db.update(StatCounter)
+                .where(StatCounter.name == name)
+                .values(value=StatCounter.value + delta, updated_on=datetime.utcnow())
+            )
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute the materialized dashboard counters."""
+    stats = rebuild_counters()
+    click.echo(f"Stat counters rebuilt: {stats}")
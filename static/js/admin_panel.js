@@ -98,19 +98,6 @@ document.addEventListener('DOMContentLoaded', function() {
         return fetch(url, { ...options, headers });
     };
 
-    // Load users data on page load
-    if (document.getElementById('pending-users-table-body')) {
-        loadPendingUsers();
-    }
-    if (document.getElementById('admins-table-body')) {
-        loadAdmins();
-    }
-    loadCourses();
-    loadEnrollments();
-    loadPayments();
-    loadCertificates();
-    loadEnquiries();
-
     // Dropdown toggle functionality for both header and sidebar
     const dropdowns = document.querySelectorAll('.dropdown');
 
@@ -1175,35 +1162,29 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Generic search function
-    function setupSearch(searchInputId, tableSelector, searchColumns) {
+    // Search runs on the server, over the whole table rather than the loaded page
+    function setupSearch(searchInputId, name) {
         const searchInput = document.getElementById(searchInputId);
         if (!searchInput) return;
 
+        let searchTimer = null;
         searchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const rows = document.querySelectorAll(`${tableSelector} tbody tr`);
-
-            rows.forEach(row => {
-                let match = false;
-                searchColumns.forEach(colIndex => {
-                    const cellText = row.cells[colIndex]?.textContent.toLowerCase() || '';
-                    if (cellText.includes(searchTerm)) {
-                        match = true;
-                    }
-                });
-                row.style.display = match ? '' : 'none';
-            });
+            const searchArg = PANEL_TABLES[name].searchArg;
+            const searchTerm = this.value.trim();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                loadPanelTable(name, searchTerm ? { [searchArg]: searchTerm } : {});
+            }, 300);
         });
     }
 
     // Setup search for each section
-    setupSearch('search-users', '#users-all table', [1, 2, 3]); // Username, Email, Mobile Number
-    setupSearch('search-courses', '#courses table', [2, 3, 4]); // Title, Category, Fee (but fee is number, still searchable)
-    setupSearch('search-enrollments', '#enrollments table', [1, 2]); // User, Course
-    setupSearch('search-payments', '#payments table', [1, 2, 3]); // User, Amount, Status
-    setupSearch('search-certificates', '#certificates table', [1, 2, 3]); // Username, Course Title, Date
-    setupSearch('search-enquiries', '#enquiries table', [1, 2, 3, 4, 5]); // Name, Email, Phone, Course, Message
+    setupSearch('search-users', 'users');
+    setupSearch('search-courses', 'courses');
+    setupSearch('search-enrollments', 'enrollments');
+    setupSearch('search-payments', 'payments');
+    setupSearch('search-certificates', 'certificates');
+    setupSearch('search-enquiries', 'enquiries');
 
 
 
@@ -1249,95 +1230,125 @@ document.addEventListener('DOMContentLoaded', function() {
 
 
     // Load data functions
-    function loadUsers() {
-        fetchWithCSRF('/admin/api/panel')
+    const PANEL_PAGE_SIZE = 50;
+
+    // Each table shows one keyset page and fetches the next on "Load more".
+    // `params` are fixed filters, `searchArg` the section's search argument.
+    const PANEL_TABLES = {
+        users: { section: 'users', body: 'users-table-body', populate: populateUsersTable, searchArg: 'search_user' },
+        admins: { section: 'users', body: 'admins-table-body', populate: populateAdminsTable, params: { role: 'admin,main_admin' } },
+        pendingUsers: { section: 'users', body: 'pending-users-table-body', populate: populatePendingUsersTable, params: { status: 'pending' } },
+        courses: { section: 'courses', body: 'courses-table-body', populate: populateCoursesTable, searchArg: 'search_course' },
+        enrollments: { section: 'enrollments', body: 'enrollments-table-body', populate: populateEnrollmentsTable, searchArg: 'search_enrollment' },
+        payments: { section: 'payments', body: 'payments-table-body', populate: populatePaymentsTable, searchArg: 'search_payment' },
+        certificates: { section: 'certificates', body: 'certificates-table-body', populate: populateCertificatesTable, searchArg: 'search_certificate' },
+        enquiries: { section: 'enquiries', body: 'enquiries-table-body', populate: populateEnquiriesTable, searchArg: 'search_enquiry' }
+    };
+
+    // Loaded rows, next cursor, current search and latest request per table
+    const panelTableState = {};
+
+    // Fetch one page of an admin panel section; returns { items, page }.
+    function fetchPanelSection(section, params = {}) {
+        const query = new URLSearchParams(Object.assign({ section: section, limit: PANEL_PAGE_SIZE }, params));
+        return fetchWithCSRF(`/admin/api/panel?${query.toString()}`)
         .then(response => response.json())
         .then(data => {
-            if (data.success) {
-                populateUsersTable(data.users);
+            if (!data.success) {
+                throw new Error(data.message || `Failed to load ${section}`);
             }
+            return { items: data[section], page: data.pages[section] };
+        });
+    }
+
+    // Load the first page of a table (with `search` params), or with
+    // more=true append the next page under the same search.
+    function loadPanelTable(name, search = null, more = false) {
+        const table = PANEL_TABLES[name];
+        const state = panelTableState[name] || (panelTableState[name] = { items: [], cursor: null, search: {}, request: 0 });
+        if (search !== null) {
+            state.search = search;
+        }
+        const params = Object.assign({}, table.params, state.search);
+        if (more && state.cursor) {
+            params.after = state.cursor;
+        }
+        const request = ++state.request;
+        return fetchPanelSection(table.section, params)
+        .then(({ items, page }) => {
+            // A newer search or reload superseded this response
+            if (request !== state.request) return;
+            state.items = more ? state.items.concat(items) : items;
+            state.cursor = page.next_cursor;
+            table.populate(state.items);
+            updateLoadMore(name);
         })
-        .catch(error => console.error('Error loading users:', error));
+        .catch(error => console.error(`Error loading ${name}:`, error));
+    }
+
+    function updateLoadMore(name) {
+        const tbody = document.getElementById(PANEL_TABLES[name].body);
+        if (!tbody) return;
+        let button = document.getElementById(`${name}-load-more`);
+        if (!button) {
+            button = document.createElement('button');
+            button.type = 'button';
+            button.id = `${name}-load-more`;
+            button.className = 'btn load-more-btn';
+            button.textContent = 'Load more';
+            button.addEventListener('click', () => loadPanelTable(name, null, true));
+            tbody.closest('table').insertAdjacentElement('afterend', button);
+        }
+        button.style.display = panelTableState[name].cursor ? '' : 'none';
+    }
+
+    function loadUsers() {
+        loadPanelTable('users');
     }
 
 
 
     function loadAdmins() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populateAdminsTable(data.users.filter(user => user.role === 'admin' || user.role === 'main_admin'));
-            }
-        })
-        .catch(error => console.error('Error loading admins:', error));
+        loadPanelTable('admins');
     }
 
     function loadPendingUsers() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populatePendingUsersTable(data.users.filter(user => user.status === 'pending'));
-            }
-        })
-        .catch(error => console.error('Error loading pending users:', error));
+        loadPanelTable('pendingUsers');
     }
 
     function loadCourses() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populateCoursesTable(data.courses);
-            }
-        })
-        .catch(error => console.error('Error loading courses:', error));
+        loadPanelTable('courses');
     }
 
     function loadEnrollments() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populateEnrollmentsTable(data.enrollments);
-            }
-        })
-        .catch(error => console.error('Error loading enrollments:', error));
+        loadPanelTable('enrollments');
     }
 
     function loadPayments() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populatePaymentsTable(data.payments);
-            }
-        })
-        .catch(error => console.error('Error loading payments:', error));
+        loadPanelTable('payments');
     }
 
     function loadCertificates() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populateCertificatesTable(data.certificates);
-            }
-        })
-        .catch(error => console.error('Error loading certificates:', error));
+        loadPanelTable('certificates');
     }
 
     function loadEnquiries() {
-        fetchWithCSRF('/admin/api/panel')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                populateEnquiriesTable(data.enquiries);
-            }
-        })
-        .catch(error => console.error('Error loading enquiries:', error));
+        loadPanelTable('enquiries');
+    }
+
+    // Load the first page of each table on page load (after PANEL_TABLES is set)
+    loadUsers();
+    if (document.getElementById('pending-users-table-body')) {
+        loadPendingUsers();
+    }
+    if (document.getElementById('admins-table-body')) {
+        loadAdmins();
     }
+    loadCourses();
+    loadEnrollments();
+    loadPayments();
+    loadCertificates();
+    loadEnquiries();
 
     // Populate table functions
     function populateUsersTable(users) {
@@ -1347,7 +1358,10 @@ document.addEventListener('DOMContentLoaded', function() {
             console.error('Expected an array for users, but received:', users);
             return;
         }
+        const { currentUserId, currentUserRole } = tbody.dataset;
         users.forEach(user => {
+            // Same rule the server applies: main admins manage everyone else, admins manage students
+            const canManage = user.id !== currentUserId && (currentUserRole === 'main_admin' || (currentUserRole === 'admin' && user.role === 'student'));
             const row = document.createElement('tr');
             row.setAttribute('data-user-id', user.id);
             row.innerHTML = `
@@ -1362,12 +1376,12 @@ document.addEventListener('DOMContentLoaded', function() {
                         <div class="btn-icon">
                             <a href="#" class="view-user-btn" data-user-id="${user.id}" data-tooltip="View"><i class="fas fa-eye"></i></a>
                         </div>
-                        <div class="btn-icon">
+                        ${canManage ? `<div class="btn-icon">
                             <a href="#" class="edit-user-btn" data-user-id="${user.id}" data-user-username="${user.username}" data-user-email="${user.email}" data-user-mobile_number="${user.mobile_number || ''}" data-user-role="${user.role}" data-user-status="${user.status}" data-user-full_name="${user.full_name || ''}" data-user-discount="${user.discount || ''}" data-tooltip="Edit"><i class="fas fa-edit"></i></a>
                         </div>
                         <div class="btn-icon">
                             <a href="#" class="delete-user-btn" data-user-id="${user.id}" data-user-username="${user.username}" data-tooltip="Delete"><i class="fas fa-trash"></i></a>
-                        </div>
+                        </div>` : ''}
                         ${user.status === 'pending' ? `<div class="btn-icon"><a href="#" class="approve-user-btn" data-user-id="${user.id}" data-tooltip="Approve"><i class="fas fa-check"></i></a></div>` : ''}
                         ${user.status === 'pending' ? `<div class="btn-icon"><a href="#" class="reject-user-btn" data-user-id="${user.id}" data-tooltip="Reject"><i class="fas fa-times"></i></a></div>` : ''}
                         ${user.role === 'admin' ? `<div class="btn-icon"><a href="#" class="update-user-status-btn" data-user-id="${user.id}" data-action="activate" data-tooltip="Activate"><i class="fas fa-toggle-on"></i></a></div>` : ''}
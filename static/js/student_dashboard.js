@@ -533,22 +533,92 @@ function hideLoading(overlay) {
 }
 
 // Notification functionality
+// Local copy of the user's notifications, kept current with delta polls
+let notificationStore = [];
+let notificationCursor = null;
+let notificationUnreadCount = 0;
+let notificationPollTimer = null;
+
 function fetchNotifications() {
-    fetch('/student/notifications')
-        .then(response => response.json())
+    const url = notificationCursor
+        ? `/student/notifications/poll?since=${encodeURIComponent(notificationCursor)}`
+        : '/student/notifications/poll';
+    fetch(url)
+        .then(response => {
+            // 304: nothing changed since the last poll
+            if (response.status === 304) {
+                return null;
+            }
+            return response.json();
+        })
         .then(data => {
-            updateNotificationBadge(data);
-            populateNotificationDropdown(data);
+            if (!data || !data.success) {
+                return;
+            }
+            mergeNotifications(data);
+            notificationCursor = data.cursor;
+            notificationUnreadCount = data.unread_count;
+            updateNotificationBadge(notificationUnreadCount);
+            populateNotificationDropdown(notificationStore);
         })
         .catch(error => console.error('Error fetching notifications:', error));
 }
 
-function updateNotificationBadge(notifications) {
+function mergeNotifications(data) {
+    if (data.reset) {
+        notificationStore = data.notifications;
+        return;
+    }
+    const byId = new Map(notificationStore.map(n => [n.id, n]));
+    data.notifications.forEach(n => byId.set(n.id, n));
+    notificationStore = Array.from(byId.values())
+        .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+}
+
+function startNotificationPolling() {
+    if (!notificationPollTimer) {
+        notificationPollTimer = setInterval(fetchNotifications, 30000);
+    }
+}
+
+function stopNotificationPolling() {
+    clearInterval(notificationPollTimer);
+    notificationPollTimer = null;
+}
+
+// Push channel: new notifications arrive over SSE; polling is only the fallback
+function connectNotificationStream() {
+    const source = new EventSource('/student/notifications/stream');
+
+    source.addEventListener('open', function() {
+        stopNotificationPolling();
+        // Catch up on anything sent while disconnected (a 304 when nothing was)
+        fetchNotifications();
+    });
+
+    source.addEventListener('notification', function(event) {
+        const notification = JSON.parse(event.data);
+        if (notificationStore.some(n => n.id === notification.id)) {
+            return;
+        }
+        mergeNotifications({ reset: false, notifications: [notification] });
+        notificationUnreadCount += 1;
+        updateNotificationBadge(notificationUnreadCount);
+        populateNotificationDropdown(notificationStore);
+    });
+
+    source.addEventListener('error', function() {
+        // EventSource retries by itself; poll until it is back. A 503 (streams
+        // off or all taken) closes it for good, so polling carries on.
+        startNotificationPolling();
+    });
+}
+
+function updateNotificationBadge(unreadCount) {
     const badge = document.getElementById('notification-badge');
     if (!badge) {
         return;
     }
-    const unreadCount = notifications.filter(n => !n.is_read).length;
 
     if (unreadCount > 0) {
         badge.textContent = unreadCount;
@@ -636,7 +706,6 @@ function markAsRead(notificationId) {
 
 // Notification setup
 function setupNotifications() {
-    let allNotifications = [];
     const notificationIcon = document.querySelector('.notification-icon');
     const notificationDropdown = document.querySelector('.notification-dropdown');
     const clearAllBtn = document.getElementById('clear-all-notifications');
@@ -670,7 +739,7 @@ function setupNotifications() {
     if (viewAllBtn) {
         viewAllBtn.addEventListener('click', function(event) {
             event.preventDefault();
-            populateNotificationDropdown(allNotifications, allNotifications.length);
+            populateNotificationDropdown(notificationStore, notificationStore.length);
         });
     }
 
@@ -684,57 +753,42 @@ function setupNotifications() {
     // Fetch notifications on page load
     fetchNotifications();
 
-    // Refresh notifications every 30 seconds
-    setInterval(fetchNotifications, 30000);
-
-    // Override fetchNotifications to store notifications
-    const originalFetchNotifications = fetchNotifications;
-    fetchNotifications = function() {
-        fetch('/student/notifications')
-            .then(response => response.json())
-            .then(data => {
-                allNotifications = data;
-                updateNotificationBadge(data);
-                populateNotificationDropdown(data);
-            })
-            .catch(error => console.error('Error fetching notifications:', error));
-    };
+    if ('EventSource' in window && notificationIcon && notificationIcon.dataset.stream === 'true') {
+        connectNotificationStream();
+    } else {
+        // Poll for changes every 30 seconds
+        startNotificationPolling();
+    }
 }
 
 function redirectBasedOnNotification(notificationId) {
-    // Fetch the notification details to determine redirect
-    fetch('/student/notifications')
-        .then(response => response.json())
-        .then(notifications => {
-            const notification = notifications.find(n => n.id === notificationId);
-            if (notification) {
-                const message = notification.message.toLowerCase();
-
-                if (message.includes('enrollment') && message.includes('approved')) {
-                    // Redirect to courses page to see enrolled courses
-                    window.location.href = '/courses';
-                } else if (message.includes('enrollment') && message.includes('rejected')) {
-                    // Redirect to courses page to try again
-                    window.location.href = '/courses';
-                } else if (message.includes('enrollment request')) {
-                    // Redirect to student dashboard to see status
-                    window.location.href = '/student/dashboard';
-                } else if (message.includes('certificate')) {
-                    // Redirect to certificates section
-                    window.location.href = '/student/dashboard#certificates-section';
-                } else if (message.includes('unenrolled') || message.includes('unenroll')) {
-                    // Redirect to courses page
-                    window.location.href = '/courses';
-                } else if (message.includes('course') && message.includes('updated')) {
-                    // Redirect to courses page
-                    window.location.href = '/courses';
-                } else {
-                    // Default redirect to student dashboard
-                    window.location.href = '/student/dashboard';
-                }
-            }
-        })
-        .catch(error => console.error('Error fetching notification details:', error));
+    const notification = notificationStore.find(n => n.id === notificationId);
+    if (notification) {
+        const message = notification.message.toLowerCase();
+
+        if (message.includes('enrollment') && message.includes('approved')) {
+            // Redirect to courses page to see enrolled courses
+            window.location.href = '/courses';
+        } else if (message.includes('enrollment') && message.includes('rejected')) {
+            // Redirect to courses page to try again
+            window.location.href = '/courses';
+        } else if (message.includes('enrollment request')) {
+            // Redirect to student dashboard to see status
+            window.location.href = '/student/dashboard';
+        } else if (message.includes('certificate')) {
+            // Redirect to certificates section
+            window.location.href = '/student/dashboard#certificates-section';
+        } else if (message.includes('unenrolled') || message.includes('unenroll')) {
+            // Redirect to courses page
+            window.location.href = '/courses';
+        } else if (message.includes('course') && message.includes('updated')) {
+            // Redirect to courses page
+            window.location.href = '/courses';
+        } else {
+            // Default redirect to student dashboard
+            window.location.href = '/student/dashboard';
+        }
+    }
 }
 
 // Enhanced Modal functionality with password strength and validation
@@ -0,0 +1,78 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db, Enquiry
+from services.pagination import InvalidPageRequest, keyset_page
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        start = datetime(2024, 1, 1)
+        for i in range(12):
+            # Every third enquiry predates the created_on default
+            created_on = None if i % 3 == 0 else start + timedelta(days=i // 2)
+            enquiry = Enquiry(id=f"{i:02d}", name=f"n{i}", email=f"e{i}@x.com", phone="1", course="c")
+            db.session.add(enquiry)
+            db.session.flush()
+            enquiry.created_on = created_on
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _all_pages(descending, limit):
+    ids, after, pages = [], None, 0
+    while True:
+        items, after = keyset_page(Enquiry.query, Enquiry.created_on, Enquiry.id, limit, after, descending)
+        ids.extend(enquiry.id for enquiry in items)
+        pages += 1
+        if after is None:
+            return ids, pages
+        assert pages < 20
+
+
+def _expected(descending):
+    enquiries = Enquiry.query.all()
+    nulls = sorted(e.id for e in enquiries if e.created_on is None)
+    dated = sorted((e.created_on, e.id) for e in enquiries if e.created_on is not None)
+    if descending:
+        return [row_id for _, row_id in reversed(dated)] + list(reversed(nulls))
+    return nulls + [row_id for _, row_id in dated]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 5, 50])
+def test_pages_through_null_sort_values(app, descending, limit):
+    with app.app_context():
+        ids, _ = _all_pages(descending, limit)
+        assert ids == _expected(descending)
+        assert len(set(ids)) == Enquiry.query.count()
+
+
+def test_cursor_inside_null_group(app):
+    with app.app_context():
+        items, after = keyset_page(Enquiry.query, Enquiry.created_on, Enquiry.id, 2)
+        assert [e.created_on for e in items] == [None, None]
+        items, _ = keyset_page(Enquiry.query, Enquiry.created_on, Enquiry.id, 3, after)
+        assert [e.created_on is None for e in items] == [True, True, False]
+
+
+def test_cursor_from_another_sort_is_rejected(app):
+    with app.app_context():
+        _, after = keyset_page(Enquiry.query, Enquiry.created_on, Enquiry.id, 2)
+        with pytest.raises(InvalidPageRequest):
+            keyset_page(Enquiry.query, Enquiry.name, Enquiry.id, 2, after)
+        with pytest.raises(InvalidPageRequest):
+            keyset_page(Enquiry.query, Enquiry.created_on, Enquiry.id, 2, after, descending=True)
@@ -5,10 +5,14 @@ import requests
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import logging
-from flask_mail import Message
+import threading
+import time
+from contextlib import contextmanager
+from flask_mail import Message, Connection, BadHeaderError
 from PIL import Image, ImageDraw, ImageFont
 from flask import current_app
 import smtplib
+from services.mail_queue import dispatch
 
 logging.basicConfig(level=logging.INFO)
 
@@ -27,7 +31,7 @@ def send_username_email(mail, app, receiver_email, username):
     try:
         msg = Message(subject, sender=app.config['MAIL_USERNAME'], recipients=[receiver_email])
         msg.body = body
-        mail.send(msg)
+        dispatch(msg)
         return True
     except Exception as e:
         app.logger.error(f"Failed to send username email to {receiver_email}: {e}")
@@ -51,7 +55,7 @@ Welcome aboard!
 
 Best regards,
 The Vidyasetu Team"""
-        current_app.extensions['mail'].send(msg)
+        dispatch(msg)
         return True
     except Exception as e:
         current_app.logger.error(f"Failed to send welcome email to {user.email}: {e}")
@@ -61,10 +65,174 @@ def send_otp_email(receiver_email: str, otp_code: str) -> bool:
     try:
         msg = Message("Your Vidyasetu OTP", sender=current_app.config['MAIL_USERNAME'], recipients=[receiver_email])
         msg.body = f"Your OTP is: {otp_code}\nDo not share with anyone."
-        current_app.extensions['mail'].send(msg)
+        dispatch(msg)
         return True
     except smtplib.SMTPException as e:
         current_app.logger.error(f"Failed to send email to {receiver_email}: {e}")
         return False
 
+def send_password_reset_email(receiver_email, reset_url):
+    """Send the password reset link"""
+    msg = Message('Password Reset Request',
+                  sender=current_app.config['MAIL_USERNAME'],
+                  recipients=[receiver_email])
+    msg.body = f'''To reset your password, visit the following link:
+{reset_url}
+If you did not make this request then simply ignore this email and no changes will be made.
+'''
+    dispatch(msg)
 
+# ---------- MAIL TRANSPORT ----------
+# Errors that concern one message; anything else means the connection is unusable
+SMTP_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError,
+                       BadHeaderError, AssertionError, ValueError)
+
+class MailMetrics:
+    """Counters for the SMTP pool; snapshot() reports throughput."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.send_seconds = 0.0
+
+    def record_connection(self, reused):
+        with self._lock:
+            if reused:
+                self.connections_reused += 1
+            else:
+                self.connections_opened += 1
+
+    def record_batch(self, sent, failed, seconds):
+        with self._lock:
+            self.messages_sent += sent
+            self.messages_failed += failed
+            self.send_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "messages_sent": self.messages_sent,
+                "messages_failed": self.messages_failed,
+                "messages_per_second": round(self.messages_sent / self.send_seconds, 2) if self.send_seconds else 0.0
+            }
+
+class SMTPConnectionPool:
+    """Keeps logged-in SMTP connections open between sends.
+
+    Idle connections are reused for up to `idle_timeout` seconds; one idle for
+    longer than `keepalive` seconds is checked with NOOP before reuse. Flask-Mail
+    still reconnects after MAIL_MAX_EMAILS messages on one connection.
+    """
+
+    def __init__(self, mail, size=2, idle_timeout=60, keepalive=15):
+        self.mail = mail
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.metrics = MailMetrics()
+        self._idle = []  # (connection, last_used)
+        self._lock = threading.Lock()
+
+    def _open(self):
+        connection = Connection(self.mail)
+        connection.host = None if self.mail.suppress else connection.configure_host()
+        connection.num_emails = 0
+        self.metrics.record_connection(reused=False)
+        return connection
+
+    def _close(self, connection):
+        try:
+            if connection.host is not None:
+                connection.host.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def _is_alive(self, connection, idle_for):
+        if connection.host is None or idle_for < self.keepalive:
+            return True
+        try:
+            return connection.host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if idle_for < self.idle_timeout and self._is_alive(connection, idle_for):
+                self.metrics.record_connection(reused=True)
+                return connection
+            self._close(connection)
+        return self._open()
+
+    def release(self, connection, broken=False):
+        with self._lock:
+            if not broken and len(self._idle) < self.size:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except (smtplib.SMTPException, OSError):
+            self.release(connection, broken=True)
+            raise
+        self.release(connection)
+
+    def send(self, messages):
+        """Send messages over pooled connections. Returns (sent, [(message, error)]).
+
+        A connection dropped by the server while idle is replaced once.
+        """
+        remaining = list(messages)
+        sent, failed = 0, []
+        retried = False
+        started = time.monotonic()
+        try:
+            while remaining:
+                try:
+                    with self.connection() as connection:
+                        while remaining:
+                            try:
+                                connection.send(remaining[0])
+                                sent += 1
+                            except SMTP_MESSAGE_ERRORS as e:
+                                failed.append((remaining[0], e))
+                            remaining.pop(0)
+                except smtplib.SMTPServerDisconnected:
+                    if retried:
+                        raise
+                    retried = True
+        finally:
+            self.metrics.record_batch(sent, len(failed), time.monotonic() - started)
+        return sent, failed
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+def get_mail_pool():
+    """Per-app SMTP pool, created on first use."""
+    pool = current_app.extensions.get('mail_pool')
+    if pool is None:
+        pool = SMTPConnectionPool(
+            current_app.extensions['mail'],
+            size=current_app.config.get('MAIL_POOL_SIZE', 2),
+            idle_timeout=current_app.config.get('MAIL_POOL_IDLE_TIMEOUT', 60),
+            keepalive=current_app.config.get('MAIL_POOL_KEEPALIVE', 15)
+        )
+        current_app.extensions['mail_pool'] = pool
+    return pool